@@ -61,7 +61,7 @@ class SimpleDanceFloor:
     """Dance Floor mit synchronen Farbwechseln für ganze Switches"""
     
     def __init__(self, sw_unten_ip=SW_UNTEN_IP, sw_oben_ip=SW_OBEN_IP, 
-                 mode="alternating", change_speed=0.5, monitor_only=False):
+                 mode="alternating", change_speed=0.5, monitor_only=False, ethers=None):
         """
         Args:
             mode: "alternating" = Switches wechseln abwechselnd
@@ -69,6 +69,8 @@ class SimpleDanceFloor:
                   "random" = zufälliges Timing
             change_speed: Sekunden zwischen Farbwechseln (float)
             monitor_only: True für Test-Modus ohne Hardware
+            ethers: optional {ip: Etherlight} mit bereits offenen Verbindungen
+                    (werden wiederverwendet und beim Stoppen nicht geschlossen)
         """
         self.mode = mode
         self.change_speed = change_speed
@@ -76,14 +78,23 @@ class SimpleDanceFloor:
         
         init_color_lut()
         
-        # Etherlight-Verbindungen
+        # Etherlight-Verbindungen (übergebene wiederverwenden, fehlende selbst öffnen)
+        ethers = ethers or {}
+        self._owned = []  # nur selbst geöffnete Verbindungen werden in stop() geschlossen
         if not monitor_only:
-            if Etherlight is None:
-                raise RuntimeError("Etherlight library nicht gefunden")
-            print("Verbinde zu Switches...")
-            self.sw_unten = Etherlight(sw_unten_ip)
-            self.sw_oben = Etherlight(sw_oben_ip)
-            time.sleep(0.3)
+            self.sw_unten = ethers.get(sw_unten_ip)
+            self.sw_oben = ethers.get(sw_oben_ip)
+            if self.sw_unten is None or self.sw_oben is None:
+                if Etherlight is None:
+                    raise RuntimeError("Etherlight library nicht gefunden")
+                print("Verbinde zu Switches...")
+                if self.sw_unten is None:
+                    self.sw_unten = Etherlight(sw_unten_ip)
+                    self._owned.append(self.sw_unten)
+                if self.sw_oben is None:
+                    self.sw_oben = Etherlight(sw_oben_ip)
+                    self._owned.append(self.sw_oben)
+                time.sleep(0.3)
             print("✓ Beide Switches verbunden")
         else:
             self.sw_unten = None
@@ -94,8 +105,8 @@ class SimpleDanceFloor:
         self._running.set()
         self._thread = None
 
-    def start(self):
-        """Startet den Dance Floor"""
+    def start(self, stop_event=None):
+        """Startet den Dance Floor (blockiert bis Ctrl+C oder stop_event gesetzt ist)"""
         if self.mode == "alternating":
             self._thread = threading.Thread(target=self._alternating_mode, daemon=True)
         elif self.mode == "sync":
@@ -110,6 +121,9 @@ class SimpleDanceFloor:
         
         try:
             while self._running.is_set():
+                if stop_event is not None and stop_event.is_set():
+                    self.stop()
+                    break
                 time.sleep(0.2)
         except KeyboardInterrupt:
             print('\n⏹ Stop angefordert...')
@@ -124,8 +138,8 @@ class SimpleDanceFloor:
             print("Schalte LEDs aus...")
             self.sw_unten.set_all_leds((0, 0, 0), 0)
             self.sw_oben.set_all_leds((0, 0, 0), 0)
-            self.sw_unten.close()
-            self.sw_oben.close()
+            for ether in self._owned:
+                ether.close()
         
         print("✓ Dance Floor gestoppt")
 
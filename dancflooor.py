@@ -64,17 +64,22 @@ def random_color_from_lut():
 
 # --- OptimizedSwitchController ---
 class OptimizedSwitchController:
-    def __init__(self, ip, name, monitor_only=False):
+    def __init__(self, ip, name, monitor_only=False, ether=None):
         self.ip = ip
         self.name = name
         self.monitor_only = monitor_only
         self.ether = None
         if not monitor_only:
-            if Etherlight is None:
-                raise RuntimeError("Etherlight library nicht gefunden")
-            self.ether = Etherlight(ip)
-            time.sleep(0.2)
-            print(f"✓ {name} verbunden")
+            if ether is not None:
+                # Bestehende Verbindung wiederverwenden (gehört dem Aufrufer)
+                self.ether = ether
+                print(f"✓ {name} nutzt bestehende Verbindung")
+            else:
+                if Etherlight is None:
+                    raise RuntimeError("Etherlight library nicht gefunden")
+                self.ether = Etherlight(ip)
+                time.sleep(0.2)
+                print(f"✓ {name} verbunden")
         self._led_buffer = [(0,0,0)] * 48
         self._lock = threading.Lock()
 
@@ -116,7 +121,7 @@ class OptimizedSwitchController:
 # --- Disco Dance Floor Controller (FIXED) ---
 class DiscoDanceFloor:
     def __init__(self, sw_unten_ip=SW_UNTEN_IP, sw_oben_ip=SW_OBEN_IP,
-                 num_dancers=3, monitor_only=False, flush_hz=20):
+                 num_dancers=3, monitor_only=False, flush_hz=20, ethers=None):
         self.monitor_only = monitor_only
         self.num_dancers = num_dancers
         self.flush_interval = 1.0 / max(1, flush_hz)
@@ -146,14 +151,18 @@ class DiscoDanceFloor:
         self._buffer_lock = threading.Lock()
 
         # Switch-Controller
-        self.sw_unten = OptimizedSwitchController(sw_unten_ip, "SW_UNTEN", monitor_only=monitor_only)
-        self.sw_oben = OptimizedSwitchController(sw_oben_ip, "SW_OBEN", monitor_only=monitor_only)
+        # ethers: optional {ip: Etherlight} mit bereits offenen Verbindungen
+        ethers = ethers or {}
+        self.sw_unten = OptimizedSwitchController(sw_unten_ip, "SW_UNTEN", monitor_only=monitor_only,
+                                                  ether=ethers.get(sw_unten_ip))
+        self.sw_oben = OptimizedSwitchController(sw_oben_ip, "SW_OBEN", monitor_only=monitor_only,
+                                                 ether=ethers.get(sw_oben_ip))
 
         self._threads = []
         self._running = threading.Event()
         self._running.set()
 
-    def start(self):
+    def start(self, stop_event=None):
         # Start Flusher
         flusher = threading.Thread(target=self._flusher_thread, name="Flusher", daemon=True)
         flusher.start()
@@ -169,6 +178,9 @@ class DiscoDanceFloor:
 
         try:
             while self._running.is_set():
+                if stop_event is not None and stop_event.is_set():
+                    self.stop()
+                    break
                 time.sleep(0.2)
         except KeyboardInterrupt:
             print('\n⏹ Stop angefordert...')
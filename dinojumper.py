@@ -1,4 +1,4 @@
-from etherlightwin import Etherlight
+from etherlightwin import Etherlight, LedCoalescer
 import time
 import keyboard
 import random
@@ -25,6 +25,7 @@ COLORS = {
 class DinoGame:
     def __init__(self, etherlight):
         self.etherlight = etherlight
+        self.coalescer = LedCoalescer(etherlight)
         self.lock = Lock()
         
         # Spieler-Position
@@ -152,17 +153,17 @@ class DinoGame:
                     if obs_led:
                         led_updates.append((obs_led, COLORS['obstacle'][0], COLORS['obstacle'][1]))
             
-            # An Switch senden
-            try:
-                self.etherlight.batch_set_leds(led_updates)
-            except Exception as e:
-                print(f"Render-Fehler: {e}")
+            # An Switch senden (schnell aufeinanderfolgende Frames werden zusammengefasst)
+            self.coalescer.submit(led_updates)
     
     def game_over_animation(self):
         """Zeigt Game Over Animation"""
         print(f"\n🦖 GAME OVER! 🦖")
         print(f"📊 Score: {int(self.score)}")
         
+        # Ausstehende Render-Frames zuerst senden
+        self.coalescer.flush()
+
         # Blinke alle LEDs rot
         for _ in range(3):
             led_updates = [(led, COLORS['obstacle'][0], COLORS['obstacle'][1]) for led in self.all_leds]
@@ -230,6 +231,7 @@ class DinoGame:
             
             # Alle LEDs ausschalten
             print("\nSchalte LEDs aus...")
+            self.coalescer.close()
             off_updates = [(led, COLORS['off'][0], COLORS['off'][1]) for led in self.all_leds]
             self.etherlight.batch_set_leds(off_updates)
 
@@ -17,6 +17,7 @@ Performance-Optimierungen:
 
 Installation:
     pip install numpy pyaudiowpatch etherlight scipy
+    (optional) pip install numba
 """
 
 import time
@@ -34,6 +35,24 @@ try:
 except ImportError:
     HAS_SCIPY = False
 
+# Numba optional: JIT für den Band-Kernel, sonst NumPy-Pfad
+try:
+    from numba import njit
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+    def njit(*args, **kwargs):
+        def decorator(fn):
+            return fn
+        return decorator
+
+# FFT: scipy.fft (pocketfft mit Plan-Cache, bleibt bei float32) falls vorhanden, sonst numpy
+try:
+    from scipy.fft import rfft
+except ImportError:
+    from numpy.fft import rfft
+
 # ----------- KORRIGIERTES LED-MAPPING -----------
 # Reihe 1 (unterste): GERADE Ports (2,4,6,8...)
 # Reihe 2: UNGERADE Ports (1,3,5,7...)
@@ -50,6 +69,9 @@ LEDS_PER_COLUMN = 4
 # Audio Config - Optimiert für Speed
 SAMPLE_RATE = 44100
 BLOCKSIZE = 512  # Kleiner = weniger Latenz aber mehr CPU
+LED_FPS = 30     # LED-Updates pro Sekunde, unabhängig von der Audio-Blockrate
+AUDIO_SCALE = np.float32(1.0 / 32768.0)  # int16 -> [-1, 1)
+STEREO_SCALE = np.float32(0.5 / 32768.0)  # (L + R) / 2 in einem Schritt
 
 # Frequenzbänder - 24 Bänder optimiert für Musik
 FREQ_BANDS = [
@@ -76,6 +98,7 @@ BEAT_MIN_INTERVAL = 0.1
 BASS_BOOST_ON_BEAT = 2.5
 BASS_FREQ_MAX = 200
 
+
 # PyAudio
 try:
     import pyaudiowpatch as pyaudio
@@ -116,18 +139,19 @@ def init_color_lut():
         
         _color_lut[i] = [r, g, b]
 
+def color_lut_index(freq_max):
+    """LUT-Index für die Farbe eines Bandes (log-skaliert 200 Hz .. 18 kHz)"""
+    if freq_max <= 200:
+        return 0
+    if freq_max >= 18000:
+        return COLOR_LUT_SIZE - 1
+    idx = int((np.log10(freq_max) - np.log10(200)) / 
+              (np.log10(18000) - np.log10(200)) * COLOR_LUT_SIZE)
+    return max(0, min(COLOR_LUT_SIZE - 1, idx))
+
 def get_color_fast(freq_max, level, beat_boost=1.0):
     """Ultra-schnelle Farbberechnung mit LUT"""
-    if freq_max <= 200:
-        idx = 0
-    elif freq_max >= 18000:
-        idx = COLOR_LUT_SIZE - 1
-    else:
-        idx = int((np.log10(freq_max) - np.log10(200)) / 
-                  (np.log10(18000) - np.log10(200)) * COLOR_LUT_SIZE)
-        idx = max(0, min(COLOR_LUT_SIZE - 1, idx))
-    
-    r, g, b = _color_lut[idx]
+    r, g, b = _color_lut[color_lut_index(freq_max)]
     brightness = 0.3 + 0.7 * level * beat_boost
     brightness = min(1.0, brightness)
     
@@ -143,6 +167,26 @@ def db_scale_vec(db_array):
     return np.clip((db_array - MIN_DB) / (MAX_DB - MIN_DB), 0.0, 1.0)
 
 
+@njit(cache=True, fastmath=True)
+def bandify(fft_mag, band_start, band_stop, band_scale, decays, levels):
+    """Bin-Summe, dB, Skalierung und Decay aller Bänder in einem Durchgang.
+    Schreibt in-place in levels (Bänder ohne Bins: start == stop -> nur Decay)."""
+    for i in range(levels.shape[0]):
+        decayed = levels[i] * decays[i]
+        start = band_start[i]
+        stop = band_stop[i]
+        if start >= stop:
+            levels[i] = decayed
+            continue
+        amp = 0.0
+        for k in range(start, stop):
+            amp += fft_mag[k]
+        amp *= band_scale[i]
+        level = (20.0 * np.log10(max(amp, 1e-12)) - MIN_DB) / (MAX_DB - MIN_DB)
+        level = min(max(level, 0.0), 1.0)
+        levels[i] = max(level, decayed)
+
+
 class BeatDetector:
     """Optimierter Beat-Detector"""
     
@@ -150,7 +194,7 @@ class BeatDetector:
         self.bass_history = deque(maxlen=history_size)
         self.last_beat_time = 0
         self.beat_strength = 0.0
-        self._history_array = np.zeros(history_size)
+        self._history_array = np.zeros(history_size, dtype=np.float32)
         self._idx = 0
     
     def detect_beat(self, bass_energy):
@@ -195,27 +239,41 @@ class FastBandAnalyzer:
             t = (freq_min - 200) / (5000 - 200)
             self.decay = DECAY_SLOW + (DECAY_FAST - DECAY_SLOW) * t
         
+        if freq_min > 5000:
+            self.gain = HIGH_BOOST
+        elif 500 <= freq_min <= 2000:
+            self.gain = MID_BOOST
+        elif freq_max < 200:
+            self.gain = BASS_BOOST
+        else:
+            self.gain = 1.0
+        
         self.fft_size = BLOCKSIZE // 2 + 1
         freqs = np.fft.rfftfreq(BLOCKSIZE, 1.0 / sample_rate)
         self.idx_mask = (freqs >= freq_min) & (freqs <= freq_max)
         self.has_data = np.any(self.idx_mask)
     
+    def weights(self):
+        """Gewichte über alle FFT-Bins: Mittelwert des Bandes inkl. Normierung und Boost"""
+        w = np.zeros(self.fft_size, dtype=np.float32)
+        if self.has_data:
+            w[self.idx_mask] = self.gain / (np.count_nonzero(self.idx_mask) * BLOCKSIZE * 2)
+        return w
+    
     def analyze_fast(self, fft_data):
         """Optimierte Analyse ohne Array-Operationen wo möglich"""
+        if not self.has_data:
+            return self.level_from_amplitude(0.0)
+        
+        band_amplitude = np.mean(fft_data[self.idx_mask]) / (BLOCKSIZE * 2) * self.gain
+        return self.level_from_amplitude(band_amplitude)
+    
+    def level_from_amplitude(self, band_amplitude):
+        """Level aus fertiger (normierter, geboosteter) Band-Amplitude mit Decay"""
         if not self.has_data:
             self.prev_level *= self.decay
             return self.prev_level
         
-        band_amplitude = np.mean(fft_data[self.idx_mask])
-        band_amplitude = band_amplitude / (BLOCKSIZE * 2)
-        
-        if self.freq_min > 5000:
-            band_amplitude *= HIGH_BOOST
-        elif 500 <= self.freq_min <= 2000:
-            band_amplitude *= MID_BOOST
-        elif self.freq_max < 200:
-            band_amplitude *= BASS_BOOST
-        
         band_db = 20.0 * np.log10(max(band_amplitude, 1e-12))
         level = max(0.0, min(1.0, (band_db - MIN_DB) / (MAX_DB - MIN_DB)))
         
@@ -226,40 +284,56 @@ class FastBandAnalyzer:
 class OptimizedSwitchController:
     """Maximale Performance Switch-Controller ohne Threading-Overhead"""
     
-    def __init__(self, ip, name):
+    def __init__(self, ip, name, ether=None):
         self.ip = ip
         self.name = name
-        self.ether = Etherlight(ip)
-        time.sleep(0.3)
-        print(f"✓ {name} verbunden", flush=True)
+        if ether is not None:
+            # Bestehende Verbindung wiederverwenden (gehört dem Aufrufer)
+            self.ether = ether
+            print(f"✓ {name} nutzt bestehende Verbindung", flush=True)
+        else:
+            self.ether = Etherlight(ip)
+            time.sleep(0.3)
+            print(f"✓ {name} verbunden", flush=True)
         
-        self._led_buffer = [(0, 0, 0)] * 48
+        # Zuletzt gesendete Farbe je LED, -1 = unbekannt (wird beim nächsten Update gesendet)
+        self._last_rgb = np.full((48, 3), -1, dtype=np.int16)
     
     def update_direct(self, led_colors):
-        """Direktes Update ohne Queue - maximale Geschwindigkeit"""
+        """Direktes Update ohne Queue - nur geänderte LEDs, als ein Batch"""
+        colors = np.asarray(led_colors, dtype=np.int16)
+        changed = np.flatnonzero(np.any(colors != self._last_rgb, axis=1))
+        if not changed.size:
+            return  # Stille/unveränderter Frame -> kein Paket
+        
+        payload = [(led_idx + 1, tuple(color), 100)
+                   for led_idx, color in zip(changed.tolist(), colors[changed].tolist())]
         try:
-            for led_idx, color in enumerate(led_colors):
-                self.ether.set_led_color(led_idx + 1, color)
-            self.ether.flush()
-        except:
-            pass
+            ok = self.ether.send_leds(payload)
+        except Exception:
+            ok = False
+        if ok:
+            self._last_rgb[changed] = colors[changed]
+        else:
+            # Stand auf dem Switch unklar -> nächstes Mal alles senden
+            self._last_rgb.fill(-1)
     
     def cleanup(self):
         """Cleanup"""
         try:
-            for i in range(1, 49):
-                self.ether.set_led_color(i, (0, 0, 0))
-            self.ether.flush()
+            self.ether.send_leds([(i, (0, 0, 0), 100) for i in range(1, 49)])
         except:
             pass
+        self._last_rgb.fill(-1)
         print(f"✓ {self.name} beendet", flush=True)
 
 
 class OptimizedDualSwitchVisualizer:
     """Maximale Performance Visualizer"""
     
-    def __init__(self, monitor_only=False):
+    def __init__(self, monitor_only=False, debug=False, ethers=None):
         self.monitor_only = monitor_only
+        self.debug = debug  # Zusatzstatistik (Max/Avg/Dunkel) im Monitor-Modus
         self.running = True
         
         init_color_lut()
@@ -271,61 +345,178 @@ class OptimizedDualSwitchVisualizer:
         
         self.beat_detector = BeatDetector()
         
-        self._levels = np.zeros(NUM_COLUMNS, dtype=np.float32)
-        self._leds_unten = [(0, 0, 0)] * 48
-        self._leds_oben = [(0, 0, 0)] * 48
-        
-        # KORRIGIERTES LED-Mapping
-        self._column_to_leds = []
-        for col in range(NUM_COLUMNS):
-            self._column_to_leds.append({
-                'row1': FIRST_ROW[col] - 1,   # Unten Reihe 1 (GERADE Ports)
-                'row2': SECOND_ROW[col] - 1,  # Unten Reihe 2 (UNGERADE Ports)
-                'row3': FIRST_ROW[col] - 1,   # Oben Reihe 3 (GERADE Ports)
-                'row4': SECOND_ROW[col] - 1   # Oben Reihe 4 (UNGERADE Ports)
-            })
+        # Band-Zuordnung einmalig als Matrix (Bänder x FFT-Bins): ein Matrix-Vektor-Produkt
+        # pro Frame statt Maske + Mittelwert je Band (Bänder überlappen, daher kein bincount)
+        self._band_weights = np.stack([a.weights() for a in self.band_analyzers])
+        # Decay/Level-Zustand aller Bänder als Arrays (statt prev_level je Analyzer)
+        self._band_decays = np.array([a.decay for a in self.band_analyzers], dtype=np.float32)
+        self._band_levels = np.zeros(len(self.band_analyzers), dtype=np.float32)
+        # Für den Numba-Kernel: Bänder sind zusammenhängende Bin-Bereiche [start, stop)
+        self._band_start = np.zeros(len(self.band_analyzers), dtype=np.int64)
+        self._band_stop = np.zeros(len(self.band_analyzers), dtype=np.int64)
+        self._band_scale = np.zeros(len(self.band_analyzers), dtype=np.float32)
+        for i, a in enumerate(self.band_analyzers):
+            bins = np.flatnonzero(a.idx_mask)
+            if bins.size:
+                self._band_start[i], self._band_stop[i] = bins[0], bins[-1] + 1
+                self._band_scale[i] = a.gain / (bins.size * BLOCKSIZE * 2)
+        # Nur Bins bis zur obersten Bandgrenze (18 kHz) werden gebraucht: Betrag und
+        # Band-Matrix darauf beschränken statt alle BLOCKSIZE/2+1 Bins zu verarbeiten
+        self._n_bins = max(int(self._band_stop.max()), int(BASS_FREQ_MAX * BLOCKSIZE / SAMPLE_RATE))
+        self._band_weights = np.ascontiguousarray(self._band_weights[:, :self._n_bins])
+        self._band_amps = np.zeros(len(self.band_analyzers), dtype=np.float32)  # wiederverwendet
         
-        self._window = np.hanning(BLOCKSIZE)
+        self._levels = np.zeros(NUM_COLUMNS, dtype=np.float32)
+        # LED-Takt entkoppelt vom Audio: zwischen vorherigem und neuem Ziel (_levels) interpolieren
+        self._prev_levels = np.zeros(NUM_COLUMNS, dtype=np.float32)
+        self._shown_levels = np.zeros(NUM_COLUMNS, dtype=np.float32)
+        self._lerp_tmp = np.zeros(NUM_COLUMNS, dtype=np.float32)
+        self._target_time = time.perf_counter()
+        self._audio_period = BLOCKSIZE / SAMPLE_RATE
+        self._beat_pending = 0.0  # stärkster Beat seit dem letzten LED-Frame
+        
+        # KORRIGIERTES LED-Mapping als flache int32-Arrays (SoA) über beide Switches:
+        # Slot 0..47 = SW_UNTEN Port 1..48, Slot 48..95 = SW_OBEN Port 1..48
+        # Höhe in der Säule: 0 = Reihe 1 (unten, GERADE Ports) .. 3 = Reihe 4 (oben, UNGERADE Ports)
+        first = np.array(FIRST_ROW, dtype=np.int32) - 1
+        second = np.array(SECOND_ROW, dtype=np.int32) - 1
+        columns = np.arange(NUM_COLUMNS, dtype=np.int32)
+        self._col_of_led = np.zeros(96, dtype=np.int32)
+        self._pos_in_col = np.zeros(96, dtype=np.int32)
+        for pos, slots in enumerate((first, second, first + 48, second + 48)):
+            self._col_of_led[slots] = columns
+            self._pos_in_col[slots] = pos
+        
+        # Grundfarbe je Säule (hängt nur von freq_max ab) und Bass-Säulen für den Beat-Boost
+        self._col_base_rgb = np.array(
+            [_color_lut[color_lut_index(a.freq_max)] for a in self.band_analyzers], dtype=np.float32)
+        self._col_is_bass = np.array([a.freq_max <= BASS_FREQ_MAX for a in self.band_analyzers])
+        # RGB-LUT je Säule und quantisiertem Pegel (0..255): Grundfarbe × (0.3 + 0.7 × Pegel)
+        brightness_steps = 0.3 + 0.7 * np.arange(256, dtype=np.float32) / 255.0
+        self._rgb_lut = (self._col_base_rgb[:, None, :] * brightness_steps[None, :, None]).astype(np.uint8)
+        self._col_idx = np.arange(NUM_COLUMNS)
+        
+        self._window = np.hanning(BLOCKSIZE).astype(np.float32)  # einmalig, passend zum float32-Input
+        self._in_buf = np.empty(BLOCKSIZE, dtype=np.float32)  # gefensterter FFT-Input, wiederverwendet
+        self._mono = np.empty(BLOCKSIZE, dtype=np.float32)    # Mono-Mix des gelesenen Blocks
+        self._stereo_sum = np.empty(BLOCKSIZE, dtype=np.int32)  # L+R vor der Skalierung
+        self._mag = np.empty(BLOCKSIZE // 2 + 1, dtype=np.float32)  # FFT-Betrag, wiederverwendet
+        
+        # Stille-Schwelle aus MIN_DB abgeleitet: |X_k| <= ||x|| * ||w|| (Cauchy-Schwarz), also ist
+        # jede Band-Amplitude <= rms * sqrt(N) * ||w|| * gain / (2N). Liegt das unter dem
+        # Pegel-Boden 10^(MIN_DB/20), liefert auch die volle FFT überall Level 0.
+        max_gain = max(a.gain for a in self.band_analyzers)
+        window_norm = float(np.sqrt(np.dot(self._window, self._window)))
+        self._silence_rms = 2.0 * 10.0 ** (MIN_DB / 20.0) * np.sqrt(BLOCKSIZE) / (window_norm * max_gain)
         
         self.frame_count = 0
         self.last_stats_time = time.time()
         self.current_fps = 0
         self.fps_samples = deque(maxlen=30)
         
+        # Monitor-Ausgabe: Säulennummern einmalig, Debug-Statistik nur 1x pro Sekunde neu
+        self._column_numbers = ''.join([str(i % 10) for i in range(1, 25)])
+        self._monitor_stats = ""
+        self._last_stats_print = 0.0
+        
         self.p = None
         self.stream = None
+        # Audio kommt per PyAudio-Callback (eigener Thread); hier nur die neuesten Blöcke puffern
+        self._audio_blocks = deque(maxlen=4)
+        self._audio_ready = threading.Event()
         
         if not monitor_only:
             print("\n🎛️  Initialisiere Switches...")
-            self.sw_unten = OptimizedSwitchController(SW_UNTEN_IP, "SW_UNTEN")
-            self.sw_oben = OptimizedSwitchController(SW_OBEN_IP, "SW_OBEN")
+            # ethers: optional {ip: Etherlight} mit bereits offenen Verbindungen
+            ethers = ethers or {}
+            self.sw_unten = OptimizedSwitchController(SW_UNTEN_IP, "SW_UNTEN", ether=ethers.get(SW_UNTEN_IP))
+            self.sw_oben = OptimizedSwitchController(SW_OBEN_IP, "SW_OBEN", ether=ethers.get(SW_OBEN_IP))
             print("✓ Beide Switches bereit!\n")
         else:
             self.sw_unten = None
             self.sw_oben = None
     
+    def _audio_callback(self, in_data, frame_count, time_info, status):
+        """PyAudio-Callback: Block nur ablegen, Verarbeitung läuft im run()-Thread"""
+        self._audio_blocks.append(in_data)
+        self._audio_ready.set()
+        return (None, pyaudio.paContinue)
+    
+    def _to_mono(self, data, num_channels):
+        """int16-Interleaved -> float32-Mono in einem Durchgang in den vorallokierten Puffer"""
+        raw = np.frombuffer(data, dtype=np.int16)
+        frames = min(len(raw) // num_channels, BLOCKSIZE)
+        mono = self._mono[:frames]
+        if num_channels == 2:
+            # Stereo: L+R in int32 (kein Überlauf), Halbierung in die Skalierung gefaltet
+            total = self._stereo_sum[:frames]
+            np.add(raw[0:2 * frames:2], raw[1:2 * frames:2], out=total, dtype=np.int32)
+            np.multiply(total, STEREO_SCALE, out=mono)
+        elif num_channels > 1:
+            np.mean(raw[:frames * num_channels].reshape(frames, num_channels), axis=1,
+                    dtype=np.float32, out=mono)
+            mono *= AUDIO_SCALE
+        else:
+            np.multiply(raw[:frames], AUDIO_SCALE, out=mono)
+        return mono
+    
     def process_audio_fast(self, audio_data):
         """Ultra-optimierte Audio-Verarbeitung"""
-        if len(audio_data) != BLOCKSIZE:
-            if len(audio_data) < BLOCKSIZE:
-                audio_data = np.pad(audio_data, (0, BLOCKSIZE - len(audio_data)), mode='constant')
+        n = len(audio_data)
+        # Billiges RMS-Gate: nur Input, der garantiert auf Level 0 abbildet, überspringt die FFT.
+        # Die Bänder klingen dann genau wie im vollen Pfad nur ab (Beat-Detector bekommt 0.0)
+        rms = np.sqrt(np.dot(audio_data, audio_data) / max(n, 1))
+        if rms <= self._silence_rms:
+            self._band_levels *= self._band_decays
+            is_beat, beat_strength = self.beat_detector.detect_beat(0.0)
+        else:
+            if n >= BLOCKSIZE:
+                np.multiply(audio_data[:BLOCKSIZE], self._window, out=self._in_buf)
             else:
-                audio_data = audio_data[:BLOCKSIZE]
-        
-        audio_data = audio_data * self._window
-        fft = np.abs(np.fft.rfft(audio_data))
-        
-        bass_energy = np.mean(fft[:int(BASS_FREQ_MAX * BLOCKSIZE / SAMPLE_RATE)])
-        is_beat, beat_strength = self.beat_detector.detect_beat(bass_energy)
-        
-        for i, analyzer in enumerate(self.band_analyzers):
-            level = analyzer.analyze_fast(fft)
+                # Kurzer Block: wie Zero-Padding, aber ohne neues Array (Fenster-Slice des Caches)
+                np.multiply(audio_data, self._window[:n], out=self._in_buf[:n])
+                self._in_buf[n:] = 0.0
+            # float32-Input -> complex64 -> Betrag direkt in den vorallokierten float32-Puffer
+            fft = np.abs(rfft(self._in_buf)[:self._n_bins], out=self._mag[:self._n_bins])
             
-            if analyzer.freq_max <= BASS_FREQ_MAX and is_beat:
-                level = min(level * (1.0 + beat_strength), 1.0)
+            bass_energy = np.mean(fft[:int(BASS_FREQ_MAX * BLOCKSIZE / SAMPLE_RATE)])
+            is_beat, beat_strength = self.beat_detector.detect_beat(bass_energy)
             
-            self._levels[i] = level
+            if HAS_NUMBA:
+                bandify(fft, self._band_start, self._band_stop, self._band_scale,
+                        self._band_decays, self._band_levels)
+            else:
+                # Alle Bänder auf einmal: Amplitude -> dB -> 0..1. Bänder ohne Bins haben eine
+                # Null-Zeile -> 1e-12-Boden in mag_to_db -> Level 0, klingen also nur ab
+                band_amps = np.dot(self._band_weights, fft, out=self._band_amps)
+                level = db_scale_vec(mag_to_db(band_amps))
+                np.maximum(level, self._band_levels * self._band_decays, out=self._band_levels)
+        
+        # Aktuell angezeigten Zwischenstand als neuen Startpunkt der Interpolation merken
+        now = time.perf_counter()
+        self._interpolate(now, self._prev_levels)
+        self._target_time = now
+        
+        self._levels[:] = self._band_levels
+        if is_beat:
+            bass = self._col_is_bass
+            self._levels[bass] = np.minimum(self._band_levels[bass] * (1.0 + beat_strength), 1.0)
+        
+        if is_beat:
+            self._beat_pending = max(self._beat_pending, beat_strength)
+    
+    def _interpolate(self, now, out):
+        """Linear zwischen _prev_levels und _levels (Ziel) nach Zeit seit dem letzten Audio-Block"""
+        alpha = min(1.0, max(0.0, (now - self._target_time) / self._audio_period))
+        np.subtract(self._levels, self._prev_levels, out=self._lerp_tmp)
+        self._lerp_tmp *= alpha
+        np.add(self._prev_levels, self._lerp_tmp, out=out)
+    
+    def render(self, now):
+        """Ein LED-/Monitor-Frame im festen LED-Takt"""
+        self._interpolate(now, self._shown_levels)
         
+        # FPS zählt gerenderte LED-Frames (nicht Audio-Blöcke)
         self.frame_count += 1
         current_time = time.time()
         elapsed = current_time - self.last_stats_time
@@ -337,10 +528,12 @@ class OptimizedDualSwitchVisualizer:
             self.frame_count = 0
             self.last_stats_time = current_time
         
+        beat_strength = self._beat_pending
+        self._beat_pending = 0.0
         if self.monitor_only:
             self._print_monitor()
         else:
-            self._update_leds_fast(is_beat, beat_strength)
+            self._update_leds_fast(beat_strength > 0.0, beat_strength)
     
     def _print_monitor(self):
         """Monitoring-Ausgabe mit Säulen-Beschriftung"""
@@ -348,52 +541,39 @@ class OptimizedDualSwitchVisualizer:
             '█' if l > 0.6 else '▓' if l > 0.4 else 
             '▒' if l > 0.25 else '░' if l > 0.1 else 
             '·' if l > 0.05 else ' '
-            for l in self._levels
+            for l in self._shown_levels
         ])
         
-        max_level = np.max(self._levels)
-        avg_level = np.mean(self._levels)
-        
-        column_numbers = ''.join([str(i % 10) for i in range(1, 25)])
-        dark_columns = [i+1 for i, l in enumerate(self._levels) if l < 0.05]
-        dark_info = f" Dunkel:[{','.join(map(str, dark_columns))}]" if dark_columns else ""
-        
-        print(f"\r    {column_numbers}", end='')
-        print(f"\r🔊 [{bars}] Max:{max_level:.2f} Avg:{avg_level:.2f} | FPS:{self.current_fps}{dark_info}".ljust(100), 
+        if self.debug:
+            now = time.time()
+            if now - self._last_stats_print >= 1.0:
+                levels = self._shown_levels
+                dark_columns = (np.flatnonzero(levels < 0.05) + 1).tolist()
+                dark_info = f" Dunkel:[{','.join(map(str, dark_columns))}]" if dark_columns else ""
+                self._monitor_stats = f" Max:{levels.max():.2f} Avg:{levels.mean():.2f}{dark_info}"
+                self._last_stats_print = now
+        
+        print(f"\r    {self._column_numbers}", end='')
+        print(f"\r🔊 [{bars}]{self._monitor_stats} | FPS:{self.current_fps}".ljust(100), 
               end='\r', flush=True)
     
     def _update_leds_fast(self, is_beat, beat_strength):
-        """Optimiertes LED-Update mit korrektem Mapping"""
+        """Vektorisiertes LED-Update: alle Farben eines Frames in einem Durchgang"""
         beat_boost = 1.0 + (beat_strength if is_beat else 0.0)
+        levels = self._shown_levels
         
-        for i in range(48):
-            self._leds_unten[i] = (0, 0, 0)
-            self._leds_oben[i] = (0, 0, 0)
+        # Farbe je Säule aus der LUT: Pegel inkl. Beat-Boost (nur Bass-Säulen) auf 0..255 quantisiert
+        boost = np.where(self._col_is_bass, np.float32(beat_boost), np.float32(1.0))
+        level_u8 = np.rint(np.minimum(levels * boost, 1.0) * 255.0).astype(np.uint8)
+        colors = self._rgb_lut[self._col_idx, level_u8]
         
-        for col in range(NUM_COLUMNS):
-            level = self._levels[col]
-            num_leds_lit = int(round(level * LEDS_PER_COLUMN))
-            
-            if num_leds_lit == 0:
-                continue
-            
-            analyzer = self.band_analyzers[col]
-            boost = beat_boost if analyzer.freq_max <= BASS_FREQ_MAX else 1.0
-            color = get_color_fast(analyzer.freq_max, level, boost)
-            
-            mapping = self._column_to_leds[col]
-            
-            if num_leds_lit >= 1:
-                self._leds_unten[mapping['row1']] = color
-            if num_leds_lit >= 2:
-                self._leds_unten[mapping['row2']] = color
-            if num_leds_lit >= 3:
-                self._leds_oben[mapping['row3']] = color
-            if num_leds_lit >= 4:
-                self._leds_oben[mapping['row4']] = color
-        
-        self.sw_unten.update_direct(self._leds_unten)
-        self.sw_oben.update_direct(self._leds_oben)
+        # Anzahl leuchtender LEDs je Säule (0..4), LED leuchtet wenn ihre Höhe darunter liegt
+        num_lit = np.rint(levels * LEDS_PER_COLUMN)
+        leds = np.where((self._pos_in_col < num_lit[self._col_of_led])[:, None],
+                        colors[self._col_of_led], 0)
+        
+        self.sw_unten.update_direct(leds[:48])
+        self.sw_oben.update_direct(leds[48:])
     
     def cleanup(self):
         """Cleanup"""
@@ -421,8 +601,10 @@ class OptimizedDualSwitchVisualizer:
         
         print("✓ Beendet", flush=True)
     
-    def run(self):
-        """Hauptschleife"""
+    def run(self, stop_event=None):
+        """Hauptschleife (endet bei Ctrl+C oder wenn stop_event gesetzt wird)"""
+        if stop_event is None:
+            stop_event = threading.Event()
         try:
             self.p = pyaudio.PyAudio()
             
@@ -469,24 +651,37 @@ class OptimizedDualSwitchVisualizer:
                 rate=int(device_info['defaultSampleRate']),
                 input=True,
                 input_device_index=device_index,
-                frames_per_buffer=BLOCKSIZE
+                frames_per_buffer=BLOCKSIZE,
+                stream_callback=self._audio_callback
             )
             
             self.stream.start_stream()
+            num_channels = device_info['maxInputChannels']
+            
+            self._audio_period = BLOCKSIZE / int(device_info['defaultSampleRate'])
+            led_period = 1.0 / LED_FPS
+            next_render = time.perf_counter()
             
-            while self.running and self.stream.is_active():
+            while self.running and self.stream.is_active() and not stop_event.is_set():
                 try:
-                    data = self.stream.read(BLOCKSIZE, exception_on_overflow=False)
-                    audio_data = np.frombuffer(data, dtype=np.int16).astype(np.float32) / 32768.0
-                    
-                    if audio_data.ndim > 1 or len(audio_data) > BLOCKSIZE:
-                        num_channels = device_info['maxInputChannels']
-                        if len(audio_data) >= BLOCKSIZE * num_channels:
-                            audio_data = audio_data[:BLOCKSIZE * num_channels].reshape(-1, num_channels).mean(axis=1)
-                        elif audio_data.ndim > 1:
-                            audio_data = audio_data.mean(axis=1)
+                    # Bis zum nächsten LED-Frame auf Audio warten
+                    timeout = next_render - time.perf_counter()
+                    if timeout > 0 and self._audio_ready.wait(timeout):
+                        self._audio_ready.clear()
+                        # Nur den neuesten Block verarbeiten, veraltete verwerfen (niedrige Latenz)
+                        data = None
+                        while self._audio_blocks:
+                            data = self._audio_blocks.popleft()
+                        if data is not None:
+                            self.process_audio_fast(self._to_mono(data, num_channels))
+                        continue
                     
-                    self.process_audio_fast(audio_data)
+                    now = time.perf_counter()
+                    self.render(now)
+                    # Fester Takt, im Verzug nicht aufholen
+                    next_render += led_period
+                    if next_render < now:
+                        next_render = now + led_period
                 except Exception as e:
                     if self.running:
                         print(f"\n✗ Audio-Fehler: {e}", flush=True)
@@ -577,7 +772,7 @@ if __name__ == '__main__':
         if MODE == 1:
             test_mapping()
         elif MODE == 2:
-            viz = OptimizedDualSwitchVisualizer(monitor_only=True)
+            viz = OptimizedDualSwitchVisualizer(monitor_only=True, debug=True)
             viz.run()
         else:
             viz = OptimizedDualSwitchVisualizer(monitor_only=False)
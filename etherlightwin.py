@@ -1,6 +1,48 @@
 import paramiko
 import time
-from threading import Lock
+from threading import Condition, Lock, Thread
+
+# Vorberechnete Byte-Bausteine für den Kommando-Puffer (keine Strings pro LED)
+_DEC_SP_BYTES = [b'%d ' % i for i in range(256)]
+_HEX_SP_BYTES = [b'%02x ' % i for i in range(256)]
+_DEC_BYTES = [b'%d' % i for i in range(256)]
+_ECHO_PREFIX = b'echo "'
+_LED_CODE_SUFFIX = b'" > /proc/led/led_code'
+_CMD_SEP = b' && '
+# Obergrenze für ein LED-Kommando inkl. Präfix, Suffix und Trenner
+_MAX_LED_CMD_LEN = len(_ECHO_PREFIX) + len(b'255 ff ff ff 255') + len(_LED_CODE_SUFFIX) + len(_CMD_SEP)
+# Sicherheitsabstand zu ARG_MAX (~128 KB) der Shell auf dem Switch
+_MAX_COMMAND_BYTES = 120_000
+
+
+def _put(buf, pos, chunk):
+    """Schreibt chunk ab pos in buf und gibt die neue Position zurück"""
+    end = pos + len(chunk)
+    buf[pos:end] = chunk
+    return end
+
+
+def _hex_sp(value):
+    """Farbwert als 'xx ' - Tabelle für 0..255, sonst formatieren (negativ ist ungültig)"""
+    if 0 <= value < 256:
+        return _HEX_SP_BYTES[value]
+    if value < 0:
+        raise ValueError(f"Ungültiger Farbwert: {value}")
+    return b'%02x ' % value
+
+
+def _append_led(buf, pos, led, r, g, b, a):
+    """Schreibt 'led rr gg bb a' ab pos in buf"""
+    # float/numpy-Werte einmal auf int bringen, sonst greifen Tabelle und %d nicht
+    led = int(led)
+    a = int(a)
+    # Tabellen nur im Bereich 0..255, alles andere per Formatierung
+    pos = _put(buf, pos, _DEC_SP_BYTES[led] if 0 <= led < 256 else b'%d ' % led)
+    pos = _put(buf, pos, _hex_sp(r))
+    pos = _put(buf, pos, _hex_sp(g))
+    pos = _put(buf, pos, _hex_sp(b))
+    return _put(buf, pos, _DEC_BYTES[a] if 0 <= a < 256 else b'%d' % a)
+
 
 class Etherlight:
     def __init__(self, ip, user: str = "nwlab"):
@@ -10,6 +52,9 @@ class Etherlight:
         self.ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
         self._lock = Lock()
         self._channel = None
+        self._led_stdin = None
+        self._cmd_buf = bytearray(8192)
+        self._buf_lock = Lock()
         
         print(f"Versuche SSH-Verbindung zu {self.user}@{ip} herzustellen...")
         try:
@@ -33,6 +78,9 @@ class Etherlight:
         
         self.write_command('echo "0" > /proc/led/led_mode', True, silent=True)
         print("✓ LED-Modus initialisiert")
+
+        # Langlebiger Stream für LED-Records (ohne Shell-Parsing pro Frame)
+        self._open_led_stream()
         self.led_cache = []
 
     def _open_channel(self):
@@ -46,8 +94,22 @@ class Etherlight:
             print(f"⚠ Fehler beim Öffnen des Channels: {e}")
             self._channel = None
 
+    def _open_led_stream(self):
+        """Startet einen persistenten 'cat > /proc/led/led_code'-Prozess"""
+        try:
+            stdin, _stdout, _stderr = self.ssh.exec_command('cat > /proc/led/led_code', get_pty=False)
+            self._led_stdin = stdin
+        except Exception as e:
+            print(f"⚠ Fehler beim Öffnen des LED-Streams: {e}")
+            self._led_stdin = None
+
     def write_command(self, command, flush=False, silent=False):
         """Optimierte Befehlsausführung mit automatischem Reconnect"""
+        if len(command) > _MAX_COMMAND_BYTES:
+            # Würde von der Shell verworfen werden - gar nicht erst senden
+            if not silent:
+                print(f"✗ Befehl zu lang ({len(command)} Bytes)")
+            return False
         try:
             with self._lock:
                 # Channel-Check und ggf. neu öffnen
@@ -57,7 +119,10 @@ class Etherlight:
                     self._open_channel()
                 
                 if self._channel and self._channel.active:
-                    self._channel.send(command + '\n')
+                    if isinstance(command, bytes):
+                        self._channel.send(command + b'\n')
+                    else:
+                        self._channel.send(command + '\n')
                     
                     if flush:
                         time.sleep(0.02)
@@ -94,24 +159,19 @@ class Etherlight:
 
     def cache_led_color(self, led, color, a=100):
         """LED-Befehl zum Cache hinzufügen"""
-        self.led_cache.append(f'{led} {hex(color[0])[2:].zfill(2)} {hex(color[1])[2:].zfill(2)} {hex(color[2])[2:].zfill(2)} {a}')
+        self.led_cache.append((led, color, a))
+
+    def _reserve_cmd_buf(self, size):
+        """Vergrößert den Kommando-Puffer bei Bedarf (nur Wachstum, nie Neuanlage)"""
+        if len(self._cmd_buf) < size:
+            self._cmd_buf.extend(bytes(size - len(self._cmd_buf)))
 
     def flush_led_cache(self):
-        """Optimiertes Cache-Flush mit größeren Chunks"""
+        """Cache über den persistenten LED-Stream senden (kein Shell-Längenlimit)"""
         if not self.led_cache:
             return
         
-        chunk_size = 50
-        chunks = [self.led_cache[i:i + chunk_size] for i in range(0, len(self.led_cache), chunk_size)]
-        
-        all_commands = []
-        for chunk in chunks:
-            command = "\\n".join(chunk)
-            all_commands.append(f'printf "{command}" > /proc/led/led_code')
-        
-        combined_command = " && ".join(all_commands)
-        self.write_command(combined_command, flush=True, silent=True)
-        
+        self.send_leds(self.led_cache)
         self.led_cache = []
 
     def set_all_leds(self, color, a=100):
@@ -129,16 +189,68 @@ class Etherlight:
             return True
             
         commands = []
-        for led, color, a in led_colors:
-            r, g, b = color
-            commands.append(f'echo "{led} {hex(r)[2:].zfill(2)} {hex(g)[2:].zfill(2)} {hex(b)[2:].zfill(2)} {a}" > /proc/led/led_code')
-        
-        # Alle Befehle mit && verketten
-        combined = " && ".join(commands)
-        return self.write_command(combined, flush=True, silent=True)
+        with self._buf_lock:
+            self._reserve_cmd_buf(min(len(led_colors) * _MAX_LED_CMD_LEN, _MAX_COMMAND_BYTES))
+            buf = self._cmd_buf
+            pos = 0
+            for led, color, a in led_colors:
+                r, g, b = color
+                # Unterhalb von ARG_MAX bleiben: ggf. in mehrere Befehle aufteilen
+                if pos + _MAX_LED_CMD_LEN > _MAX_COMMAND_BYTES:
+                    commands.append(bytes(memoryview(buf)[:pos]))
+                    pos = 0
+                # Alle Befehle mit && verketten
+                if pos:
+                    pos = _put(buf, pos, _CMD_SEP)
+                pos = _put(buf, pos, _ECHO_PREFIX)
+                pos = _append_led(buf, pos, led, r, g, b, a)
+                pos = _put(buf, pos, _LED_CODE_SUFFIX)
+            commands.append(bytes(memoryview(buf)[:pos]))
+
+        success = True
+        for command in commands:
+            success = self.write_command(command, flush=True, silent=True) and success
+        return success
+
+    def send_leds(self, led_colors):
+        """
+        Schreibt LED-Records ('led rr gg bb a' pro Zeile) direkt in den
+        persistenten cat-Prozess - kein printf, kein &&, keine Shell.
+        led_colors: Iterable von (led, (r, g, b), alpha) Tupeln
+        """
+        led_colors = list(led_colors)
+        if not led_colors:
+            return True
+
+        with self._buf_lock:
+            self._reserve_cmd_buf(len(led_colors) * _MAX_LED_CMD_LEN)
+            buf = self._cmd_buf
+            pos = 0
+            for led, color, a in led_colors:
+                r, g, b = color
+                pos = _append_led(buf, pos, led, r, g, b, a)
+                pos = _put(buf, pos, b'\n')
+            payload = bytes(memoryview(buf)[:pos])
+
+        try:
+            with self._lock:
+                if self._led_stdin is None or self._led_stdin.channel.closed:
+                    self._open_led_stream()
+                self._led_stdin.write(payload)
+                self._led_stdin.flush()
+            return True
+        except Exception:
+            # Stream kaputt -> beim nächsten Mal neu öffnen, jetzt über die Shell senden
+            self._led_stdin = None
+            return self.batch_set_leds(led_colors)
 
     def close(self):
         """SSH-Verbindung schließen"""
+        if self._led_stdin:
+            try:
+                self._led_stdin.close()
+            except:
+                pass
         if self._channel:
             try:
                 self._channel.close()
@@ -155,4 +267,78 @@ class Etherlight:
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
-        self.close()
\ No newline at end of file
+        self.close()
+
+
+class LedCoalescer:
+    """
+    Nagle-ähnliches Zusammenfassen von LED-Batches: alles, was innerhalb von
+    window Sekunden (oder während ein Send noch läuft) eingereicht wird, wird
+    pro LED gemerged (neuester Wert gewinnt) und als ein Batch gesendet.
+    Gesendet wird von genau einem langlebigen Daemon-Thread.
+    """
+
+    def __init__(self, etherlight, window=0.005):
+        self.etherlight = etherlight
+        self.window = window
+        self._pending = {}
+        self._lock = Lock()
+        self._cond = Condition(self._lock)
+        self._submitted = 0      # Anzahl eingereichter Batches
+        self._sent = 0           # davon bereits gesendet (oder verworfen)
+        self._flush_requested = False
+        self._closed = False
+        self._thread = Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, led_colors):
+        """led_colors: Liste von (led, (r, g, b), alpha) Tupeln"""
+        with self._cond:
+            for update in led_colors:
+                self._pending[update[0]] = update
+            self._submitted += 1
+            self._cond.notify_all()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if not self._pending:
+                    return
+                # Fenster abwarten, flush()/close() kürzen es ab
+                deadline = time.monotonic() + self.window
+                while not (self._flush_requested or self._closed):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                batch = list(self._pending.values())
+                self._pending = {}
+                target = self._submitted
+                self._flush_requested = False
+            try:
+                self.etherlight.batch_set_leds(batch)
+            except Exception as e:
+                print(f"✗ Fehler beim Senden des Batches: {e}")
+            with self._cond:
+                self._sent = target
+                self._cond.notify_all()
+
+    def flush(self):
+        """Wartende Updates sofort senden (z.B. vor direkten Batch-Aufrufen)"""
+        with self._cond:
+            target = self._submitted
+            if self._sent >= target:
+                return
+            self._flush_requested = True
+            self._cond.notify_all()
+            while self._sent < target and self._thread.is_alive():
+                self._cond.wait()
+
+    def close(self):
+        """Restliche Updates senden und den Sender-Thread beenden"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join()
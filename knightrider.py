@@ -1,4 +1,3 @@
-import threading
 import time
 from etherlightwin import Etherlight
 
@@ -17,71 +16,73 @@ COLORS = {
     'off': (0, 0, 0)
 }
 
-def animate_right(row, etherlight, delay=0.03):
+def animate_right_step(row, idx):
+    """Updates für einen Schritt nach rechts (Kopf bei idx)"""
     n = len(row)
-    # Batch-Updates vorbereiten
-    for idx in range(n):
-        updates = [(row[idx], COLORS['main'])]
-        
-        if idx - 1 >= 0:
-            updates.append((row[idx-1], COLORS['trail1']))
-        if idx - 2 >= 0:
-            updates.append((row[idx-2], COLORS['trail2']))
-        if idx - 3 >= 0:
-            updates.append((row[idx-3], COLORS['trail3']))
-        if idx - 4 >= 0:
-            updates.append((row[idx-4], COLORS['off']))
-        
-        # Alle Updates auf einmal senden (falls API das unterstützt)
-        for led, color in updates:
-            etherlight.set_led_color(led, color)
-        
-        time.sleep(delay)
+    if idx >= n:
+        return []
+    updates = [(row[idx], COLORS['main'])]
+    
+    if idx - 1 >= 0:
+        updates.append((row[idx-1], COLORS['trail1']))
+    if idx - 2 >= 0:
+        updates.append((row[idx-2], COLORS['trail2']))
+    if idx - 3 >= 0:
+        updates.append((row[idx-3], COLORS['trail3']))
+    if idx - 4 >= 0:
+        updates.append((row[idx-4], COLORS['off']))
+    return updates
 
-def animate_left(row, etherlight, delay=0.03):
+def animate_left_step(row, idx):
+    """Updates für einen Schritt nach links (Kopf bei idx)"""
     n = len(row)
-    for idx in range(n-1, -1, -1):
-        updates = [(row[idx], COLORS['main'])]
-        
-        if idx + 1 < n:
-            updates.append((row[idx+1], COLORS['trail1']))
-        if idx + 2 < n:
-            updates.append((row[idx+2], COLORS['trail2']))
-        if idx + 3 < n:
-            updates.append((row[idx+3], COLORS['trail3']))
-        if idx + 4 < n:
-            updates.append((row[idx+4], COLORS['off']))
-        
-        for led, color in updates:
-            etherlight.set_led_color(led, color)
-        
-        time.sleep(delay)
-
-def run_sw(sw_ip, row, user="neubauer"):
-    etherlight = Etherlight(sw_ip, user)
+    if idx >= n:
+        return []
+    updates = [(row[idx], COLORS['main'])]
     
+    if idx + 1 < n:
+        updates.append((row[idx+1], COLORS['trail1']))
+    if idx + 2 < n:
+        updates.append((row[idx+2], COLORS['trail2']))
+    if idx + 3 < n:
+        updates.append((row[idx+3], COLORS['trail3']))
+    if idx + 4 < n:
+        updates.append((row[idx+4], COLORS['off']))
+    return updates
+
+def send_step(sessions, step_fn, idx):
+    # Alle Reihen eines Switches in einem Batch über dieselbe Verbindung senden
+    for etherlight, rows in sessions.values():
+        updates = [(led, color, 100) for row in rows for led, color in step_fn(row, idx)]
+        etherlight.batch_set_leds(updates)
+
+def run_sw(switch_rows, user="neubauer", delay=0.03):
+    # Eine Verbindung pro Switch-IP (SWITCH_UNTEN und SWITCH_OP teilen sich aktuell eine)
+    sessions = {}
+    for sw_ip, row in switch_rows:
+        if sw_ip not in sessions:
+            sessions[sw_ip] = (Etherlight(sw_ip, user), [])
+        sessions[sw_ip][1].append(row)
+
     # Schnelles initiales Ausschalten - nur einmal
-    for led in row:
-        etherlight.set_led_color(led, COLORS['off'])
+    for etherlight, rows in sessions.values():
+        etherlight.batch_set_leds([(led, COLORS['off'], 100) for row in rows for led in row])
 
+    n = max(len(row) for _ip, row in switch_rows)
     try:
         while True:
-            animate_right(row, etherlight, delay=0.03)
-            animate_left(row, etherlight, delay=0.03)
+            for idx in range(n):
+                send_step(sessions, animate_right_step, idx)
+                time.sleep(delay)
+            for idx in range(n-1, -1, -1):
+                send_step(sessions, animate_left_step, idx)
+                time.sleep(delay)
     except Exception as e:
-        print(f"Fehler in run_sw({sw_ip}): {e}")
+        print(f"Fehler in run_sw({', '.join(sessions)}): {e}")
 
 def realrun(user="neubauer"):
-    thread_op = threading.Thread(target=run_sw, args=(SWITCH_UNTEN, FIRST_ROW, user), daemon=True)
-    thread_unten = threading.Thread(target=run_sw, args=(SWITCH_OP, SECOND_ROW, user), daemon=True)
-    
-    thread_op.start()
-    thread_unten.start()
-    
     try:
-        # Effizienter als time.sleep(0)
-        thread_op.join()
-        thread_unten.join()
+        run_sw([(SWITCH_UNTEN, FIRST_ROW), (SWITCH_OP, SECOND_ROW)], user)
     except KeyboardInterrupt:
         print("\nKnight Rider gestoppt")
 
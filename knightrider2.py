@@ -37,6 +37,11 @@ COLOR_PRIORITY = {
     'main': 4
 }
 
+# Prioritäten als int-Konstanten für die heißen Pfade (statt Dict-Lookups)
+OFF, TRAIL3, TRAIL2, TRAIL1, MAIN = 0, 1, 2, 3, 4
+# RGB je Priorität (Index = Priorität)
+RGB = tuple(COLOR_MAP[name] for name in ('off', 'trail3', 'trail2', 'trail1', 'main'))
+
 def compute_pingpong_pos(step, n):
     """
     Berechnet die Position (0..n-1) auf einer Strecke der Länge n
@@ -51,6 +56,17 @@ def compute_pingpong_pos(step, n):
     else:
         return period - cyc
 
+def compute_direction(step, n):
+    """
+    Bewegungsrichtung des Kopfes bei step: 1 = nach rechts, -1 = nach links.
+    """
+    if n <= 1:
+        return 1
+    pos = compute_pingpong_pos(step, n)
+    prev_pos = compute_pingpong_pos(step - 1, n)
+    # pos == prev_pos tritt selten auf (z.B. bei n==2), default nach rechts
+    return -1 if pos < prev_pos else 1
+
 def build_frame_for_row(row, step):
     """
     Erzeugt ein Frame für eine einzelne Reihe mit einem Kopf, der
@@ -61,75 +77,102 @@ def build_frame_for_row(row, step):
     pos = compute_pingpong_pos(step, n)
 
     # Bestimme die Bewegungsrichtung anhand der vorherigen Position
-    if n <= 1:
-        direction = 1
-    else:
-        prev_pos = compute_pingpong_pos(step - 1, n)
-        if pos > prev_pos:
-            direction = 1   # bewegt sich nach rechts (Index steigt)
-        elif pos < prev_pos:
-            direction = -1  # bewegt sich nach links (Index fällt)
-        else:
-            # selten (z.B. bei n==2), default nach rechts
-            direction = 1
-
-    frame = {}
-
-    def try_set(idx_in_row, color_name):
+    direction = compute_direction(step, n)
+
+    frame = {}  # led -> (prio, rgb)
+
+    def try_set(idx_in_row, prio, rgb):
         if 0 <= idx_in_row < n:
             led = row[idx_in_row]
             existing = frame.get(led)
-            if existing is None or COLOR_PRIORITY[color_name] > COLOR_PRIORITY[existing]:
-                frame[led] = color_name
+            if existing is None or existing[0] < prio:
+                frame[led] = (prio, rgb)
 
     # Hauptlicht (Kopf)
-    try_set(pos, 'main')
+    try_set(pos, MAIN, RGB[MAIN])
 
     # Trails je nach Richtung hinter dem Kopf platzieren
     if direction == 1:
         # Kopf bewegt sich nach rechts -> Trails links vom Kopf
-        try_set(pos - 1, 'trail1')
-        try_set(pos - 2, 'trail2')
-        try_set(pos - 3, 'trail3')
-        try_set(pos - 4, 'off')
+        try_set(pos - 1, TRAIL1, RGB[TRAIL1])
+        try_set(pos - 2, TRAIL2, RGB[TRAIL2])
+        try_set(pos - 3, TRAIL3, RGB[TRAIL3])
+        try_set(pos - 4, OFF, RGB[OFF])
         # kleinen 'Sicherheits'-Off rechts vom Kopf setzen (optional)
-        try_set(pos + 1, 'off')
+        try_set(pos + 1, OFF, RGB[OFF])
     else:
         # Kopf bewegt sich nach links -> Trails rechts vom Kopf
-        try_set(pos + 1, 'trail1')
-        try_set(pos + 2, 'trail2')
-        try_set(pos + 3, 'trail3')
-        try_set(pos + 4, 'off')
+        try_set(pos + 1, TRAIL1, RGB[TRAIL1])
+        try_set(pos + 2, TRAIL2, RGB[TRAIL2])
+        try_set(pos + 3, TRAIL3, RGB[TRAIL3])
+        try_set(pos + 4, OFF, RGB[OFF])
         # kleinen 'Sicherheits'-Off links vom Kopf setzen (optional)
-        try_set(pos - 1, 'off')
+        try_set(pos - 1, OFF, RGB[OFF])
+
+    return frame
 
-    return {row_idx: COLOR_MAP[color] for row_idx, color in frame.items()}
+
+# Farbstufen vom Kopf aus nach hinten als (prio, rgb)
+TRAIL_LEVELS = tuple((prio, RGB[prio]) for prio in (MAIN, TRAIL1, TRAIL2, TRAIL3, OFF))
+
+def build_step_delta(row, step):
+    """
+    Liefert nur die LEDs, die sich gegenüber step-1 ändern, wenn der Kopf
+    in gleicher Richtung einen Schritt weiterläuft: neuer Kopf, die Trails
+    rutschen eine Stufe ab, das letzte Trail-LED geht aus.
+    """
+    n = len(row)
+    pos = compute_pingpong_pos(step, n)
+    direction = compute_direction(step, n)
+
+    delta = {}
+    for offset, level in enumerate(TRAIL_LEVELS):
+        idx_in_row = pos - offset * direction
+        if 0 <= idx_in_row < n:
+            delta[row[idx_in_row]] = level
+    return delta
+
+def build_full_row_frame(row, step):
+    """
+    Komplettes Frame einer Reihe (nicht gesetzte LEDs 'off').
+    """
+    frame = dict.fromkeys(row, (OFF, RGB[OFF]))
+    frame.update(build_frame_for_row(row, step))
+    return frame
 
 
 def animate_rows(etherlight, rows):
     lengths = [len(r) for r in rows]
     max_len = max(lengths)
 
-    inv_color_map = {v: k for k, v in COLOR_MAP.items()}
+    last_directions = [None] * len(rows)
 
     try:
         step = 0
         while True:
-            merged_updates = {}  # led -> (color_name, rgb)
-
-            for row in rows:
-                frame = build_frame_for_row(row, step)
-                for led, rgb in frame.items():
-                    incoming_name = inv_color_map[rgb]
-                    if led not in merged_updates:
-                        merged_updates[led] = (incoming_name, rgb)
-                    else:
-                        current_name, current_rgb = merged_updates[led]
-                        if COLOR_PRIORITY[incoming_name] > COLOR_PRIORITY[current_name]:
-                            merged_updates[led] = (incoming_name, rgb)
-
-            for led, (_name, rgb) in merged_updates.items():
-                etherlight.set_led_color(led, rgb)
+            merged_updates = {}  # led -> (prio, rgb)
+
+            for i, row in enumerate(rows):
+                direction = compute_direction(step, len(row))
+                if last_directions[i] is None:
+                    # Start: einmal die ganze Reihe senden
+                    frame = build_full_row_frame(row, step)
+                    last_directions[i] = direction
+                elif direction != last_directions[i]:
+                    # Richtungswechsel: nur Unterschiede zum vorherigen Frame
+                    prev_frame = build_full_row_frame(row, step - 1)
+                    frame = {led: level for led, level in build_full_row_frame(row, step).items()
+                             if prev_frame[led] != level}
+                    last_directions[i] = direction
+                else:
+                    frame = build_step_delta(row, step)
+                for led, incoming in frame.items():
+                    current = merged_updates.get(led)
+                    if current is None or current[0] < incoming[0]:
+                        merged_updates[led] = incoming
+
+            # Als ein Batch senden (RGB steckt schon im Frame)
+            etherlight.batch_set_leds([(led, rgb, 100) for led, (_, rgb) in merged_updates.items()])
 
             step += 1
 
@@ -1,5 +1,7 @@
 import time
+import threading
 from etherlightwin import Etherlight
+from timing import wait_until
 
 SWITCH = "172.16.146.212"  # Nur noch ein Switch
 FIRST_ROW = [1,3,5,7,9,11,13,15,17,19,21,23,25,27,29,31,33,35,37,39,41,43,45,47]
@@ -14,8 +16,10 @@ COLORS = {
     'off': (0, 0, 0)
 }
 
-def animate_right(row, etherlight, delay=0.03):
+def build_right_frames(row):
+    """Alle Schritte nach rechts als fertige Batch-Listen (led, rgb, alpha)"""
     n = len(row)
+    frames = []
     for idx in range(n):
         updates = [(row[idx], COLORS['main'])]
         if idx - 1 >= 0:
@@ -26,12 +30,13 @@ def animate_right(row, etherlight, delay=0.03):
             updates.append((row[idx-3], COLORS['trail3']))
         if idx - 4 >= 0:
             updates.append((row[idx-4], COLORS['off']))
-        for led, color in updates:
-            etherlight.set_led_color(led, color)
-        time.sleep(delay)
+        frames.append([(led, color, 100) for led, color in updates])
+    return frames
 
-def animate_left(row, etherlight, delay=0.03):
+def build_left_frames(row):
+    """Alle Schritte nach links als fertige Batch-Listen (led, rgb, alpha)"""
     n = len(row)
+    frames = []
     for idx in range(n-1, -1, -1):
         updates = [(row[idx], COLORS['main'])]
         if idx + 1 < n:
@@ -42,27 +47,54 @@ def animate_left(row, etherlight, delay=0.03):
             updates.append((row[idx+3], COLORS['trail3']))
         if idx + 4 < n:
             updates.append((row[idx+4], COLORS['off']))
-        for led, color in updates:
-            etherlight.set_led_color(led, color)
-        time.sleep(delay)
+        frames.append([(led, color, 100) for led, color in updates])
+    return frames
 
-def run_sw(sw_ip, row, user="neubauer"):
-    etherlight = Etherlight(sw_ip, user)
-    # Einmaliges Ausschalten der LEDs in der Reihe
-    for led in row:
-        etherlight.set_led_color(led, COLORS['off'])
+# Einmalig beim Import vorberechnet - ROW und COLORS sind konstant
+RIGHT_FRAMES = build_right_frames(ROW)
+LEFT_FRAMES = build_left_frames(ROW)
+
+def animate_right(etherlight, frames=RIGHT_FRAMES, delay=0.03):
+    deadline = time.perf_counter()
+    for frame in frames:
+        etherlight.batch_set_leds(frame)
+        deadline = wait_until(deadline, delay)
+
+def animate_left(etherlight, frames=LEFT_FRAMES, delay=0.03):
+    deadline = time.perf_counter()
+    for frame in frames:
+        etherlight.batch_set_leds(frame)
+        deadline = wait_until(deadline, delay)
+
+def run_sw(sw_ip, row, user="neubauer", stop_event=None, etherlight=None):
+    if stop_event is None:
+        stop_event = threading.Event()
+    # Bestehende Verbindung wiederverwenden (z.B. aus main.py), sonst selbst öffnen
+    owns_connection = etherlight is None
+    if owns_connection:
+        etherlight = Etherlight(sw_ip, user)
+    # Einmaliges Ausschalten der LEDs in der Reihe (ein Batch)
+    etherlight.batch_set_leds([(led, COLORS['off'], 100) for led in row])
+
+    if row is ROW:
+        right_frames, left_frames = RIGHT_FRAMES, LEFT_FRAMES
+    else:
+        right_frames, left_frames = build_right_frames(row), build_left_frames(row)
 
     try:
-        while True:
-            animate_right(row, etherlight, delay=0.03)
-            animate_left(row, etherlight, delay=0.03)
+        while not stop_event.is_set():
+            animate_right(etherlight, right_frames, delay=0.03)
+            animate_left(etherlight, left_frames, delay=0.03)
     except Exception as e:
         print(f"Fehler in run_sw({sw_ip}): {e}")
+    finally:
+        if owns_connection:
+            etherlight.close()
 
-def realrun(user="neubauer"):
+def realrun(user="neubauer", stop_event=None, etherlight=None):
     try:
-        # Direkt im Hauptthread ausführen (ein Switch, eine Reihe)
-        run_sw(SWITCH, ROW, user)
+        # Direkt im aufrufenden Thread ausführen (ein Switch, eine Reihe)
+        run_sw(SWITCH, ROW, user, stop_event, etherlight)
     except KeyboardInterrupt:
         print("\nKnight Rider gestoppt")
 
@@ -1,5 +1,20 @@
 from etherlightwin import Etherlight
+from timing import wait_until
 import time
+import math
+import numpy as np
+
+# Numba ist optional - ohne läuft build_frame als normales Python
+try:
+    from numba import njit
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+    def njit(*args, **kwargs):
+        def decorator(fn):
+            return fn
+        return decorator
 
 # Nur ein Switch
 SWITCH_IP = "172.16.26.138"
@@ -34,54 +49,61 @@ COLOR_PRIORITY = {
     'main': 4
 }
 
+# Farbpalette als (r, g, b, alpha) uint8-Array, indiziert über die Priorität
+PALETTE = np.zeros((len(COLOR_PRIORITY), 4), dtype=np.uint8)
+for _name, _prio in COLOR_PRIORITY.items():
+    _rgb, _alpha = COLOR_MAP[_name]
+    PALETTE[_prio] = (*_rgb, _alpha)
+
+def pingpong_period(n):
+    return 2 * n - 2 if n > 1 else 1
+
 def compute_pingpong_pos(step, n):
+    return _pingpong_pos(step % pingpong_period(n), n)
+
+def compute_direction(step, n):
+    return _pingpong_direction(step % pingpong_period(n), n)
+
+# Hängt nur von (step % period, n) ab - die Frame-Tabelle wird einmal pro Periode vorberechnet
+def _pingpong_pos(cyc, n):
     if n <= 1:
         return 0
     period = 2 * n - 2
-    cyc = step % period
     if cyc < n:
         return cyc
     else:
         return period - cyc
 
-def build_frame_for_row(row, step):
-    n = len(row)
-    pos = compute_pingpong_pos(step, n)
-
+def _pingpong_direction(cyc, n):
     if n <= 1:
-        direction = 1
-    else:
-        prev_pos = compute_pingpong_pos(step - 1, n)
-        if pos > prev_pos:
-            direction = 1
-        elif pos < prev_pos:
-            direction = -1
-        else:
-            direction = 1
-
-    frame = {}
-
-    def try_set(idx_in_row, color_name):
-        if 0 <= idx_in_row < n:
-            led = row[idx_in_row]
-            existing = frame.get(led)
-            if existing is None or COLOR_PRIORITY[color_name] > COLOR_PRIORITY[existing]:
-                frame[led] = color_name
-
-    # Hauptlicht (Kopf)
-    try_set(pos, 'main')
-
-    # Trails je nach Richtung hinter dem Kopf platzieren
-    if direction == 1:
-        try_set(pos - 1, 'trail1')
-        try_set(pos - 2, 'trail2')
-        try_set(pos - 3, 'trail3')
-    else:
-        try_set(pos + 1, 'trail1')
-        try_set(pos + 2, 'trail2')
-        try_set(pos + 3, 'trail3')
+        return 1
+    pos = _pingpong_pos(cyc, n)
+    prev_pos = _pingpong_pos((cyc - 1) % pingpong_period(n), n)
+    return -1 if pos < prev_pos else 1
 
-    return {led: color_name for led, color_name in frame.items()}
+@njit(cache=True)
+def build_frame(row_ids, pos, direction, prio):
+    """
+    Schreibt Kopf + Trails einer Reihe als Priorität (main=4 .. trail3=1,
+    siehe COLOR_PRIORITY) in prio (Index = LED-Nummer). Bei Überlappungen
+    gewinnt die höhere Priorität.
+    """
+    n = row_ids.shape[0]
+    for k in range(4):
+        idx = pos - k * direction
+        if 0 <= idx < n:
+            led = row_ids[idx]
+            p = 4 - k
+            if prio[led] < p:
+                prio[led] = p
+
+def changed_leds(prev_frame, frame):
+    """LED-Nummern, deren (r, g, b, alpha) sich zwischen zwei Frames unterscheidet"""
+    return np.nonzero(np.any(frame != prev_frame, axis=1))[0]
+
+def frame_batch(frame, leds):
+    """Batch-Liste (led, rgb, alpha) für die angegebenen LEDs eines Frames"""
+    return [(led, tuple(c[:3]), c[3]) for led, c in zip(leds.tolist(), frame[leds].tolist())]
 
 def animate_rows(etherlight, rows, step_delay=0.08):
     """
@@ -93,45 +115,68 @@ def animate_rows(etherlight, rows, step_delay=0.08):
         all_leds.update(r)
     all_leds = sorted(all_leds)
 
+    # Frame-Zustand als (max_led+1, 4) uint8-Arrays (rgb + alpha), Index = LED-Nummer.
+    max_led = all_leds[-1] if all_leds else 0
+    prio = np.zeros(max_led + 1, dtype=np.int8)
+    row_arrays = [np.asarray(r, dtype=np.int32) for r in rows]
+    all_led_idx = np.asarray(all_leds, dtype=np.intp)
+
+    # Die gemergten Frames wiederholen sich nach lcm der Reihen-Perioden ->
+    # alle Frames und die Deltas zum jeweiligen Vorgänger einmal vorberechnen
+    period = math.lcm(*(pingpong_period(len(r)) for r in rows))
+    print(f"Berechne {period} Frames vor ({'Numba' if HAS_NUMBA else 'Python, numba nicht installiert'})...")
+    frames = np.empty((period, max_led + 1, 4), dtype=np.uint8)
+    for s in range(period):
+        # Baseline: alle LEDs auf 'off' (Priorität 0), Überlappungen per Priorität mergen
+        prio.fill(COLOR_PRIORITY['off'])
+        for row_ids in row_arrays:
+            n = len(row_ids)
+            build_frame(row_ids, compute_pingpong_pos(s, n), compute_direction(s, n), prio)
+        frames[s] = PALETTE[prio]
+    # frames[s - 1] ist für s == 0 der letzte Frame der Periode
+    deltas = [frame_batch(frames[s], changed_leds(frames[s - 1], frames[s])) for s in range(period)]
+
+    # Nach dem Init in run_sw sind alle LEDs aus
+    prio.fill(COLOR_PRIORITY['off'])
+    first_batch = frame_batch(frames[0], changed_leds(PALETTE[prio], frames[0]))
+    resend_all = False
+
     step = 0
     error_count = 0
     max_errors = 10
+    deadline = time.perf_counter()
     
     try:
         while True:
             try:
-                # Baseline: alle LEDs auf 'off' setzen
-                merged_updates = {led: ('off', COLOR_MAP['off'][0], COLOR_MAP['off'][1]) for led in all_leds}
-
-                # Für jede Reihe ein Frame bauen
-                for row in rows:
-                    frame = build_frame_for_row(row, step)
-                    for led, color_name in frame.items():
-                        curr_name, curr_rgb, curr_alpha = merged_updates.get(led, ('off', COLOR_MAP['off'][0], COLOR_MAP['off'][1]))
-                        if COLOR_PRIORITY[color_name] > COLOR_PRIORITY[curr_name]:
-                            rgb, alpha = COLOR_MAP[color_name]
-                            merged_updates[led] = (color_name, rgb, alpha)
-
-                # Batch-Aufruf mit Alpha-Werten
-                if merged_updates:
-                    led_colors = []
-                    for led, (_name, rgb, alpha) in merged_updates.items():
-                        led_colors.append((led, rgb, alpha))
+                frame_idx = step % period
+
+                # Nur geänderte LEDs senden (nach einem Fehler einmal alle)
+                if resend_all:
+                    led_colors = frame_batch(frames[frame_idx], all_led_idx)
+                elif step == 0:
+                    led_colors = first_batch
+                else:
+                    led_colors = deltas[frame_idx]
 
+                if led_colors:
                     success = etherlight.batch_set_leds(led_colors)
                     if not success:
+                        resend_all = True
                         error_count += 1
                         if error_count >= max_errors:
                             print(f"\n⚠ Zu viele Fehler ({error_count}), beende Animation")
                             break
                         time.sleep(0.1)  # Kurze Pause bei Fehler
                     else:
+                        resend_all = False
                         error_count = 0  # Reset bei Erfolg
 
-                time.sleep(step_delay)
+                deadline = wait_until(deadline, step_delay)
                 step += 1
 
             except Exception as e:
+                resend_all = True
                 error_count += 1
                 print(f"\n⚠ Fehler in Animation: {e}")
                 if error_count >= max_errors:
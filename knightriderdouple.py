@@ -27,8 +27,10 @@ Verwendung:
 
 import time
 import sys
-from queue import Queue
 import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+import numpy as np
+from timing import wait_until
 
 # ------------------ Konfiguration / Defaults ------------------
 DEFAULT_COLS = 24  # Länge (LEDs pro Zeile)
@@ -75,21 +77,39 @@ def hsv_to_rgb255(h, s, v):
     return (int(r * 255), int(g * 255), int(b * 255))
 
 
+# Vorberechnete Knight-Rider-Farbe je Intensität in 1%-Schritten (Index = int(intensity * 100))
+RED_LUT = [hsv_to_rgb255(HUE_KR, 1.0, 0.2 + 0.8 * i / 100) for i in range(101)]
+
+
 # ------------------ SwitchController ------------------
 class SwitchController:
     """Controller für einen Switch als ROWS x COLS Grid.
-    update_grid(grid) erwartet eine Liste von ROWS Reihen, jede Reihe eine Liste von COLS RGB-Tuples.
+    update_grid(grid) erwartet ein uint8-Array der Form (ROWS, COLS, 3).
     Die interne Mapping-Strategie ist: led_index = row * cols + col + 1
     """
 
-    def __init__(self, ip, name, rows, cols):
+    def __init__(self, ip, name, rows, cols, flush_every_n_frames=1, max_flush_delay=0.05):
         self.ip = ip
         self.name = name
         self.rows = rows
         self.cols = cols
-        self.update_queue = Queue(maxsize=10)
+        # "Neuestes gewinnt": nur das letzte Grid zählt, Event weckt den Update-Thread
+        self._latest = None
+        self._new = threading.Event()
         self.running = True
         self.ether = None
+        self._last_grid = None  # zuletzt gesendetes Grid, None -> alles senden
+        # LED-Index je Zelle einmalig vorberechnen (row * cols + col + 1)
+        self._led_indices = np.arange(1, rows * cols + 1).reshape(rows, cols)
+        # Spaltennummern als Strings für die Simulationsausgabe
+        self._col_strs = list(map(str, range(cols)))
+        # Änderungen mehrerer Frames sammeln und gemeinsam senden:
+        # Flush nach flush_every_n_frames Frames oder spätestens nach max_flush_delay Sekunden
+        self.flush_every_n_frames = max(1, int(flush_every_n_frames))
+        self.max_flush_delay = max_flush_delay
+        self._pending = {}  # led_index -> (r, g, b)
+        self._pending_frames = 0
+        self._pending_deadline = 0.0
 
         print(f"🔌 Initialisiere {name} ({ip}) - {rows}x{cols}...", flush=True)
         if HAS_ETHERLIGHT:
@@ -109,56 +129,97 @@ class SwitchController:
     def _update_loop(self):
         while self.running:
             try:
-                if not self.update_queue.empty():
-                    grid = self.update_queue.get(timeout=0.1)
-                    # grid: rows x cols of (r,g,b) tuples
-                    if self.ether is not None:
-                        # Schreiben auf die Hardware (angenommenes Mapping)
-                        try:
-                            for r in range(self.rows):
-                                for c in range(self.cols):
-                                    led_index = r * self.cols + c + 1
-                                    color = grid[r][c]
-                                    try:
-                                        self.ether.set_led_color(led_index, color)
-                                    except Exception:
-                                        pass
-                            try:
-                                self.ether.flush()
-                            except Exception:
-                                pass
-                        except Exception as e:
-                            print(f"✗ {self.name} Hardware-Update Fehler: {e}", flush=True)
-                    else:
-                        # Simulation: kompakte Terminalausgabe
-                        out = []
-                        for r in range(self.rows):
-                            lit_cols = [str(c) for c in range(self.cols) if grid[r][c] != (0, 0, 0)]
-                            out.append(f"R{r+1}:[{','.join(lit_cols) if lit_cols else '-'}]")
-                        print(f"Sim {self.name}: " + " | ".join(out), flush=True)
+                # Blockiert bis ein Grid kommt (kein Busy-Polling); mit offenen
+                # Änderungen höchstens bis zu deren Flush-Deadline
+                timeout = 0.1
+                if self._pending_frames:
+                    timeout = max(0.0, self._pending_deadline - time.perf_counter())
+                if not self._new.wait(timeout):
+                    if self._pending_frames:
+                        self._send_pending()
+                    continue
+                self._new.clear()
+                if not self.running:
+                    # von cleanup() geweckt
+                    break
+                grid = self._latest
+                if grid is None:
+                    continue
+                # grid: (rows, cols, 3) uint8
+                if self.ether is not None:
+                    # Schreiben auf die Hardware (angenommenes Mapping)
+                    try:
+                        # Nur Zellen sammeln, die sich seit dem letzten Grid geändert haben
+                        if self._last_grid is None:
+                            changed = np.ones(grid.shape[:2], dtype=bool)
+                        else:
+                            changed = np.any(grid != self._last_grid, axis=2)
+                        self._last_grid = grid
+                        if not changed.any():
+                            continue
+                        # Spätere Frames überschreiben frühere -> Endstand bleibt korrekt
+                        self._pending.update(zip(self._led_indices[changed].tolist(),
+                                                 map(tuple, grid[changed].tolist())))
+                        if not self._pending_frames:
+                            self._pending_deadline = time.perf_counter() + self.max_flush_delay
+                        self._pending_frames += 1
+                        if self._pending_frames >= self.flush_every_n_frames:
+                            self._send_pending()
+                    except Exception as e:
+                        print(f"✗ {self.name} Hardware-Update Fehler: {e}", flush=True)
                 else:
-                    time.sleep(0.005)
+                    # Simulation: kompakte Terminalausgabe
+                    out = []
+                    lit = grid.any(axis=2)
+                    for r in range(self.rows):
+                        lit_cols = [self._col_strs[c] for c in np.flatnonzero(lit[r]).tolist()]
+                        out.append(f"R{r+1}:[{','.join(lit_cols) if lit_cols else '-'}]")
+                    print(f"Sim {self.name}: " + " | ".join(out), flush=True)
             except Exception as e:
                 if self.running:
                     print(f"✗ {self.name} Update-Loop Fehler: {e}", flush=True)
+        # Beim Beenden noch gesammelte Änderungen senden
+        if self._pending_frames:
+            self._send_pending()
+
+    def _send_pending(self):
+        """Sendet die gesammelten Änderungen mehrerer Frames als einen Batch."""
+        led_updates = [(led_index, color, 100) for led_index, color in self._pending.items()]
+        self._pending.clear()
+        self._pending_frames = 0
+        try:
+            if hasattr(self.ether, 'batch_set_leds'):
+                if not self.ether.batch_set_leds(led_updates):
+                    # Stand auf dem Switch unklar -> nächstes Mal alles senden
+                    self._last_grid = None
+            else:
+                # Ältere Etherlight-Klasse ohne Batch-API
+                for led_index, color, a in led_updates:
+                    try:
+                        self.ether.set_led_color(led_index, color, a)
+                    except Exception:
+                        pass
+                try:
+                    self.ether.flush()
+                except Exception:
+                    pass
+        except Exception as e:
+            self._last_grid = None
+            print(f"✗ {self.name} Hardware-Update Fehler: {e}", flush=True)
 
     def update_grid(self, grid):
         # grid validation
-        if not isinstance(grid, list) or len(grid) != self.rows:
+        if not isinstance(grid, np.ndarray) or grid.shape != (self.rows, self.cols, 3):
             print(f"⚠ Ungültiges Grid für {self.name}", flush=True)
             return
-        try:
-            if self.update_queue.full():
-                try:
-                    self.update_queue.get_nowait()
-                except Exception:
-                    pass
-            self.update_queue.put_nowait(grid)
-        except Exception:
-            pass
+        # Kopie übergeben, damit der Aufrufer seinen Puffer sofort wiederverwenden kann
+        self._latest = grid.copy()
+        self._new.set()
 
     def cleanup(self):
         self.running = False
+        # Update-Thread sofort aufwecken
+        self._new.set()
         if self.update_thread.is_alive():
             self.update_thread.join(timeout=1.0)
         print(f"✓ {self.name} beendet", flush=True)
@@ -183,36 +244,45 @@ class DualSwitchKnightRider:
         self.row_oben = 1
         self.row_unten = 0
 
-        # Controller-Objekte
+        # Wiederverwendete Grid-Puffer (werden pro Frame nur geleert)
+        self._grid_oben = self._empty_grid()
+        self._grid_unten = self._empty_grid()
+
+        # Controller-Objekte - beide Switches parallel verbinden
+        # (die Frame-Updates laufen danach ohnehin je Switch in einem eigenen Thread)
+        self.pool = ThreadPoolExecutor(max_workers=2)
         if not self.simulate:
             print("Initialisiere reale Switches...", flush=True)
-            self.sw_oben = SwitchController(self.sw_oben_ip, "SW_OBEN", rows=self.rows, cols=self.cols)
-            self.sw_unten = SwitchController(self.sw_unten_ip, "SW_UNTEN", rows=self.rows, cols=self.cols)
+            name_oben, name_unten = "SW_OBEN", "SW_UNTEN"
         else:
             print("  Simulation-Modus (keine Etherlight-Hardware)", flush=True)
-            self.sw_oben = SwitchController(self.sw_oben_ip, "SW_OBEN_SIM", rows=self.rows, cols=self.cols)
-            self.sw_unten = SwitchController(self.sw_unten_ip, "SW_UNTEN_SIM", rows=self.rows, cols=self.cols)
+            name_oben, name_unten = "SW_OBEN_SIM", "SW_UNTEN_SIM"
+        f_oben = self.pool.submit(SwitchController, self.sw_oben_ip, name_oben, rows=self.rows, cols=self.cols)
+        f_unten = self.pool.submit(SwitchController, self.sw_unten_ip, name_unten, rows=self.rows, cols=self.cols)
+        self.sw_oben = f_oben.result()
+        self.sw_unten = f_unten.result()
 
         self.running = True
 
     def _empty_grid(self):
-        return [[(0, 0, 0) for _ in range(self.cols)] for _ in range(self.rows)]
+        return np.zeros((self.rows, self.cols, 3), dtype=np.uint8)
 
     def _set_column(self, col, intensity=1.0):
-        # Erzeuge leeres Grid für oben und unten
-        grid_oben = self._empty_grid()
-        grid_unten = self._empty_grid()
+        # Vorallokierte Grids für oben und unten leeren
+        grid_oben = self._grid_oben
+        grid_unten = self._grid_unten
+        grid_oben.fill(0)
+        grid_unten.fill(0)
 
         # Farbe und Helligkeit
         v = max(0.0, min(1.0, intensity))
-        bright = 0.2 + 0.8 * v
-        rgb = hsv_to_rgb255(HUE_KR, 1.0, bright)
+        rgb = RED_LUT[int(v * 100)]
 
         # Setze die entsprechende Zelle (row, col)
         # Prüfe Grenzen
         if 0 <= col < self.cols:
-            grid_oben[self.row_oben][col] = rgb
-            grid_unten[self.row_unten][col] = rgb
+            grid_oben[self.row_oben, col] = rgb
+            grid_unten[self.row_unten, col] = rgb
 
             # Zusätzliche Testausgabe: wenn Spalte 0 aktiv -> "PORT 1 wird angesteuert"
             if col == 0:
@@ -225,17 +295,15 @@ class DualSwitchKnightRider:
     def kinghtrider(self, speed=KR_SPEED_DEFAULT, loops=None):
         total = self.cols
         iteration = 0
+        # Vorwärts, dann rückwärts (ohne Doppel am Ende)
+        sweep = list(range(total)) + list(range(total - 2, -1, -1))
+        deadline = time.perf_counter()
 
         try:
             while self.running:
-                # Vorwärts
-                for c in range(total):
-                    self._set_column(c)
-                    time.sleep(speed)
-                # Rückwärts (ohne Doppel am Ende)
-                for c in range(total - 2, -1, -1):
+                for c in sweep:
                     self._set_column(c)
-                    time.sleep(speed)
+                    deadline = wait_until(deadline, speed)
 
                 iteration += 1
                 if loops is not None and iteration >= loops:
@@ -247,10 +315,15 @@ class DualSwitchKnightRider:
 
     def cleanup(self):
         self.running = False
-        if self.sw_oben:
-            self.sw_oben.cleanup()
-        if self.sw_unten:
-            self.sw_unten.cleanup()
+        controllers = [sw for sw in (self.sw_oben, self.sw_unten) if sw]
+        if self.pool is not None:
+            # Beide Switches parallel herunterfahren
+            wait([self.pool.submit(sw.cleanup) for sw in controllers])
+            self.pool.shutdown()
+            self.pool = None
+        else:
+            for sw in controllers:
+                sw.cleanup()
         print("✓ Knight-Rider beendet", flush=True)
 
 
@@ -1,5 +1,7 @@
 import sys
-import subprocess
+import os
+import threading
+import importlib.util
 from PyQt6.QtWidgets import (
     QApplication,
     QWidget,
@@ -8,6 +10,29 @@ from PyQt6.QtWidgets import (
     QLabel,
     QMessageBox
 )
+from etherlightwin import Etherlight
+
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+_load_lock = threading.Lock()
+
+
+def load_script(filename: str):
+    """Lädt ein Effekt-Script als Modul (einmalig, danach aus sys.modules).
+
+    Über importlib statt import, weil Dateinamen wie "knightrider3.1.py"
+    keine gültigen Modulnamen sind.
+    """
+    name = os.path.splitext(filename)[0].replace(".", "_").replace(" ", "_")
+    with _load_lock:
+        module = sys.modules.get(name)
+        if module is None:
+            spec = importlib.util.spec_from_file_location(name, os.path.join(SCRIPT_DIR, filename))
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+            sys.modules[name] = module
+        return module
 
 
 class ChildWindow(QWidget):
@@ -27,22 +52,26 @@ class MainWindow(QWidget):
         self.setWindowTitle("Hauptfenster")
         self.setFixedSize(350, 240)
 
-        # Liste für alle gestarteten Subprozesse
-        self.processes: list[subprocess.Popen] = []
+        # Alle gestarteten Effekt-Threads: Thread-ID -> (thread, stop_event)
+        self.runs: dict[int, tuple[threading.Thread, threading.Event]] = {}
+
+        # Offene Switch-Verbindungen (IP -> Etherlight), über alle Effekte wiederverwendet
+        self.ether_cache: dict[str, Etherlight] = {}
+        self._ether_lock = threading.Lock()
 
         # Buttons
         btn1 = QPushButton("Öffne dance 2")
         btn2 = QPushButton("Öffne double Music")
         btn3 = QPushButton("Öffne knight Rider 3.1")
         btn4 = QPushButton("Öffne dancflooor")
-        btn_stop_all = QPushButton("Stoppe alle Subprozesse")
+        btn_stop_all = QPushButton("Stoppe alle Effekte")
 
         # Events
         btn1.clicked.connect(self.open_window_a)
         btn2.clicked.connect(self.open_window_b)
         btn3.clicked.connect(self.start_knightrider)
         btn4.clicked.connect(self.start_testrider)
-        btn_stop_all.clicked.connect(self.stop_all_processes)
+        btn_stop_all.clicked.connect(lambda: self.stop_all_runs())
 
         # Layout
         layout = QVBoxLayout()
@@ -58,93 +87,136 @@ class MainWindow(QWidget):
         self.window_a = None
         self.window_b = None
 
-    # Beispiel: originalfunktionen bleiben unverändert (hier nur Platzhalter-Aufrufe)
+    # Effekte laufen im selben Prozess in eigenen Threads (kein Interpreter-Start pro Klick)
     def open_window_a(self):
-        # Falls music_play ein externes Script starten soll, benutze start_process()
-        # hier nur ein Beispiel: subprocess starten
-        self.start_process([sys.executable, "dance_floor.py"], "dance_floor.py")
+        self.start_script("dance_floor.py",
+                          lambda m, stop: m.SimpleDanceFloor(ethers=self.switch_connections(m)).start(stop))
 
     def open_window_b(self):
-        self.start_process([sys.executable, "doubleMusic.py"], "doubleMusic.py")
+        self.start_script("doubleMusic.py",
+                          lambda m, stop: m.OptimizedDualSwitchVisualizer(
+                              ethers=self.switch_connections(m)).run(stop))
 
-    # Startet knightrider.py und speichert den Prozess
+    # Startet knightrider3.1.py im Thread
     def start_knightrider(self):
-        self.start_process([sys.executable, "knightrider3.1.py"], "knightrider.3.1.py")
+        self.start_script("knightrider3.1.py",
+                          lambda m, stop: m.realrun(user="nwlab", stop_event=stop,
+                                                    etherlight=self.get_or_connect(m.SWITCH, "nwlab")))
 
-    # Startet testrider.py und speichert den Prozess
+    # Startet dancflooor.py im Thread
     def start_testrider(self):
-        self.start_process([sys.executable, "dancflooor.py"], "dancflooor.py")
-
-    # Hilfsfunktion: Prozess starten und referenz speichern
-    def start_process(self, cmd: list[str], name: str = ""):
-        # vorher beendete Prozesse aus der Liste entfernen
-        self.prune_finished_processes()
-
+        self.start_script("dancflooor.py",
+                          lambda m, stop: m.DiscoDanceFloor(monitor_only=False,
+                                                            ethers=self.switch_connections(m)).start(stop))
+
+    # Liefert die gecachte Verbindung zu einem Switch (verbindet nur beim ersten Mal)
+    def get_or_connect(self, ip: str, user: str = "nwlab") -> Etherlight:
+        with self._ether_lock:
+            ether = self.ether_cache.get(ip)
+            if ether is not None and not self._is_alive(ether):
+                # Switch neu gestartet / Link weg -> tote Verbindung verwerfen und neu verbinden
+                print(f"Verbindung zu {ip} ist tot -> verbinde neu")
+                try:
+                    ether.close()
+                except Exception:
+                    pass
+                del self.ether_cache[ip]
+                ether = None
+            if ether is None:
+                ether = Etherlight(ip, user)
+                self.ether_cache[ip] = ether
+            return ether
+
+    # Prüft, ob der SSH-Transport einer gecachten Verbindung noch aktiv ist
+    @staticmethod
+    def _is_alive(ether: Etherlight) -> bool:
         try:
-            p = subprocess.Popen(cmd)
-            p._friendly_name = name or " ".join(cmd)  # optionaler Name zu Debugzwecken
-            self.processes.append(p)
-            print(f"Starte Prozess: {p._friendly_name} (PID={p.pid})")
-        except Exception as e:
-            QMessageBox.critical(self, "Fehler", f"Konnte Prozess nicht starten:\n{e}")
-
-    # Entfernt beendete Prozesse aus self.processes
-    def prune_finished_processes(self):
-        running = []
-        for p in self.processes:
-            if p.poll() is None:  # None => läuft noch
-                running.append(p)
-            else:
-                print(f"Prozess beendet (PID={getattr(p, 'pid', 'unknown')}) -> wird entfernt")
-        self.processes = running
-
-    # Beendet alle laufenden Subprozesse (terminate -> wait -> kill falls nötig)
-    def stop_all_processes(self):
-        self.prune_finished_processes()
-        if not self.processes:
-            QMessageBox.information(self, "Info", "Es laufen keine Subprozesse.")
+            transport = ether.ssh.get_transport()
+        except Exception:
+            return False
+        return transport is not None and transport.is_active()
+
+    # Gecachte Verbindungen für die beiden Switches eines Scripts (SW_UNTEN_IP/SW_OBEN_IP)
+    def switch_connections(self, module, user: str = "nwlab") -> dict[str, Etherlight]:
+        return {ip: self.get_or_connect(ip, user) for ip in (module.SW_UNTEN_IP, module.SW_OBEN_IP)}
+
+    # Schließt alle gecachten Switch-Verbindungen
+    def close_connections(self):
+        with self._ether_lock:
+            for ip, ether in self.ether_cache.items():
+                try:
+                    ether.close()
+                except Exception as e:
+                    print(f"Fehler beim Schließen der Verbindung zu {ip}: {e}")
+            self.ether_cache.clear()
+
+    # Hilfsfunktion: Script laden und Einstiegspunkt in einem Thread starten
+    def start_script(self, filename: str, entry):
+        # vorher beendete Threads aus der Liste entfernen
+        self.prune_finished_runs()
+
+        stop_event = threading.Event()
+
+        def target():
+            try:
+                entry(load_script(filename), stop_event)
+            except BaseException as e:  # auch SystemExit aus den Scripts abfangen
+                print(f"✗ {filename} beendet mit Fehler: {e!r}", flush=True)
+
+        t = threading.Thread(target=target, name=filename, daemon=True)
+        t.start()
+        self.runs[t.ident] = (t, stop_event)
+        print(f"Starte Effekt: {filename} (Thread={t.name})")
+
+    # Entfernt beendete Threads aus self.runs
+    def prune_finished_runs(self):
+        for ident, (t, _) in list(self.runs.items()):
+            if not t.is_alive():
+                print(f"Effekt beendet ({t.name}) -> wird entfernt")
+                del self.runs[ident]
+
+    # Signalisiert allen Effekten das Ende und wartet kurz auf die Threads
+    def stop_all_runs(self, confirm: bool = True):
+        self.prune_finished_runs()
+        if not self.runs:
+            if confirm:
+                QMessageBox.information(self, "Info", "Es laufen keine Effekte.")
             return
 
-        for p in list(self.processes):  # copy, da wir in loop ggf. modifizieren
-            try:
-                if p.poll() is None:
-                    print(f"Sende terminate() an PID={p.pid} ({getattr(p, '_friendly_name', '')})")
-                    p.terminate()
-                    try:
-                        p.wait(timeout=3)  # kurz warten, ob er vernünftig endet
-                        print(f"Prozess PID={p.pid} wurde beendet.")
-                    except subprocess.TimeoutExpired:
-                        print(f"PID={p.pid} reagiert nicht auf terminate(), sende kill()")
-                        p.kill()
-                        p.wait(timeout=3)
-                        print(f"PID={p.pid} wurde gekillt.")
-                else:
-                    print(f"PID={p.pid} war bereits beendet.")
-            except Exception as e:
-                print(f"Fehler beim Beenden von PID={getattr(p, 'pid', 'unknown')}: {e}")
-            finally:
-                # egal was passiert, entfernen wir ihn aus der Liste
-                if p in self.processes:
-                    self.processes.remove(p)
-
-        QMessageBox.information(self, "Fertig", "Alle Subprozesse wurden gestoppt (oder versucht zu stoppen).")
-
-    # Beim Schließen der App ebenfalls alle Subprozesse beenden
+        # erst alle signalisieren, damit die Threads parallel herunterfahren
+        for _, stop_event in self.runs.values():
+            stop_event.set()
+        for t, _ in self.runs.values():
+            t.join(timeout=3)  # kurz warten, ob er vernünftig endet
+            if t.is_alive():
+                print(f"{t.name} reagiert nicht auf stop_event (Daemon-Thread endet mit der App)")
+            else:
+                print(f"{t.name} wurde beendet.")
+        # alle wurden signalisiert -> Buchführung in einem Schritt leeren
+        self.runs.clear()
+
+        if confirm:
+            QMessageBox.information(self, "Fertig", "Alle Effekte wurden gestoppt (oder versucht zu stoppen).")
+
+    # Beim Schließen der App ebenfalls alle Effekte beenden
     def closeEvent(self, event):
-        if self.processes:
+        self.prune_finished_runs()
+        if self.runs:
             # Hinweis an den Nutzer
             reply = QMessageBox.question(
                 self,
                 "Beenden",
-                "Es laufen noch Subprozesse. Beim Beenden werden diese gestoppt. Fortfahren?",
+                "Es laufen noch Effekte. Beim Beenden werden diese gestoppt. Fortfahren?",
                 QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
             )
             if reply == QMessageBox.StandardButton.Yes:
-                self.stop_all_processes()
+                self.stop_all_runs(confirm=False)
+                self.close_connections()
                 event.accept()
             else:
                 event.ignore()
         else:
+            self.close_connections()
             event.accept()
 
 
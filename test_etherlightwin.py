@@ -0,0 +1,24 @@
+import unittest
+
+from etherlightwin import _append_led, _MAX_LED_CMD_LEN
+
+
+def _format(led, rgb, a):
+    buf = bytearray(_MAX_LED_CMD_LEN * 2)
+    end = _append_led(buf, 0, led, *rgb, a)
+    return bytes(buf[:end])
+
+
+class AppendLedTest(unittest.TestCase):
+    def test_in_range(self):
+        self.assertEqual(_format(12, (255, 0, 16), 100), b'12 ff 00 10 100')
+
+    def test_float_alpha(self):
+        self.assertEqual(_format(5, (1, 2, 3), 100.0), b'5 01 02 03 100')
+
+    def test_led_out_of_range(self):
+        self.assertEqual(_format(300, (0, 0, 0), 255), b'300 00 00 00 255')
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,3 +1,4 @@
+import sys
 import time
 import threading
 
@@ -7,47 +8,42 @@ NUM_LEDS_START_1_ROW = 1
 NUM_LEDS_START_2_ROW = 25
 NUM_LEDS_END_1_ROW = 24
 NUM_LEDS_END_2_ROW = 48
+STEPS_PER_SECOND = 20
 
-def totheright(NUM_LEDS_START, NUM_LEDS_END, sw, switch_name):
-    print(f"==> Starte totheright auf Switch '{switch_name}' mit IP {sw}")
-    time.sleep(1)
-    
-    for i in range(NUM_LEDS_START, NUM_LEDS_END + 1):
-        print(f"[{switch_name}] LED {i}: Haupt-LED (hellrot) an Port {sw}")
-        
-        if i - 1 >= NUM_LEDS_START:
-            print(f"[{switch_name}] LED {i-1}: 1 LED davor dunkler an Port {sw}")
-        if i - 2 >= NUM_LEDS_START:
-            print(f"[{switch_name}] LED {i-2}: 2 LEDs davor noch dunkler an Port {sw}")
-        if i - 3 >= NUM_LEDS_START:
-            print(f"[{switch_name}] LED {i-3}: 3 LEDs davor aus an Port {sw}")
-        if i + 1 <= NUM_LEDS_END:
-            print(f"[{switch_name}] LED {i+1}: LED nach Haupt-LED aus an Port {sw}")
-        if i + 2 <= NUM_LEDS_END:
-            print(f"[{switch_name}] LED {i+2}: LED nach Haupt-LED aus an Port {sw}")
-        
-        time.sleep(0.05)
-    print(f"==> Fertig mit totheright auf Switch '{switch_name}'\n")
+# Nachbar-LEDs relativ zur Haupt-LED je Laufrichtung (1 = rechts, -1 = links)
+RIDER_OFFSETS = {
+    1: ((-1, "1 LED davor dunkler"), (-2, "2 LEDs davor noch dunkler"), (-3, "3 LEDs davor aus"),
+        (1, "LED nach Haupt-LED aus"), (2, "LED nach Haupt-LED aus")),
+    -1: ((1, "1 LED danach dunkler"), (2, "2 LEDs danach noch dunkler"), (3, "3 LEDs danach aus"),
+         (-1, "LED vor Haupt-LED aus"), (-2, "LED vor Haupt-LED aus")),
+}
 
-def totheleft(NUM_LEDS_START, NUM_LEDS_END, sw, switch_name):
-    print(f"==> Starte totheleft auf Switch '{switch_name}' mit IP {sw}")
+def rider(NUM_LEDS_START, NUM_LEDS_END, sw, switch_name, step, steps_per_second=STEPS_PER_SECOND):
+    name = "totheright" if step > 0 else "totheleft"
+    offsets = RIDER_OFFSETS[1 if step > 0 else -1]
+    leds = range(NUM_LEDS_START, NUM_LEDS_END + 1) if step > 0 else range(NUM_LEDS_END, NUM_LEDS_START - 1, -1)
+    target_period = 1.0 / steps_per_second
+    print(f"==> Starte {name} auf Switch '{switch_name}' mit IP {sw}")
     time.sleep(1)
     
-    for i in range(NUM_LEDS_END, NUM_LEDS_START -1, -1):
-        print(f"[{switch_name}] LED {i}: Haupt-LED (hellrot) an Port {sw}")
-        if i + 1 <= NUM_LEDS_END:
-            print(f"[{switch_name}] LED {i+1}: 1 LED danach dunkler an Port {sw}")
-        if i + 2 <= NUM_LEDS_END:
-            print(f"[{switch_name}] LED {i+2}: 2 LEDs danach noch dunkler an Port {sw}")
-        if i + 3 <= NUM_LEDS_END:
-            print(f"[{switch_name}] LED {i+3}: 3 LEDs danach aus an Port {sw}")
-        if i - 1 >= NUM_LEDS_START:
-            print(f"[{switch_name}] LED {i-1}: LED vor Haupt-LED aus an Port {sw}")
-        if i - 2 >= NUM_LEDS_START:
-            print(f"[{switch_name}] LED {i-2}: LED vor Haupt-LED aus an Port {sw}")
+    for i in leds:
+        t0 = time.perf_counter()
+        # Alle Zeilen eines Schritts sammeln und mit einem write ausgeben
+        lines = [f"[{switch_name}] LED {i}: Haupt-LED (hellrot) an Port {sw}\n"]
+        for offset, text in offsets:
+            if NUM_LEDS_START <= i + offset <= NUM_LEDS_END:
+                lines.append(f"[{switch_name}] LED {i + offset}: {text} an Port {sw}\n")
+        sys.stdout.write("".join(lines))
         
-        time.sleep(0.05)
-    print(f"==> Fertig mit totheleft auf Switch '{switch_name}'\n")
+        # Nur die Restzeit des Schritts schlafen, damit sich die Schrittrate selbst einregelt
+        time.sleep(max(0, target_period - (time.perf_counter() - t0)))
+    print(f"==> Fertig mit {name} auf Switch '{switch_name}'\n")
+
+def totheright(NUM_LEDS_START, NUM_LEDS_END, sw, switch_name, steps_per_second=STEPS_PER_SECOND):
+    rider(NUM_LEDS_START, NUM_LEDS_END, sw, switch_name, 1, steps_per_second)
+
+def totheleft(NUM_LEDS_START, NUM_LEDS_END, sw, switch_name, steps_per_second=STEPS_PER_SECOND):
+    rider(NUM_LEDS_START, NUM_LEDS_END, sw, switch_name, -1, steps_per_second)
 
 def run_sw_op():
     while True:
@@ -0,0 +1,16 @@
+import time
+
+
+def wait_until(deadline, delay):
+    """
+    Feste Schrittdauer per Deadline statt delay + Sendezeit: schläft bis
+    deadline + delay und gibt die neue Deadline zurück. Im Verzug wird nicht
+    aufgeholt, sondern ab jetzt weitergezählt.
+    """
+    deadline += delay
+    remaining = deadline - time.perf_counter()
+    if remaining > 0:
+        time.sleep(remaining)
+    else:
+        deadline -= remaining
+    return deadline